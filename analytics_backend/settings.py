@@ -164,6 +164,17 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Redis Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Per-process cap on pooled connections (see events.connections); unset keeps
+# redis-py's default. A full pool raises instead of waiting.
+REDIS_MAX_CONNECTIONS = (
+    int(os.environ["REDIS_MAX_CONNECTIONS"])
+    if os.getenv("REDIS_MAX_CONNECTIONS")
+    else None
+)
+
+# Rate limiting: "fixed_window" keeps one counter per key and window;
+# "sliding_window" keeps a sorted set of request timestamps for exact windows
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "fixed_window")
 
 # RQ Configuration
 RQ_QUEUES = {
@@ -177,6 +188,15 @@ RQ_QUEUES = {
     },
 }
 
+# Event processing
+# Rows per INSERT when workers bulk-create events drained from the stream;
+# also the default number of events a worker reads from the stream at once
+EVENT_BULK_BATCH_SIZE = int(os.getenv("EVENT_BULK_BATCH_SIZE", "500"))
+# Approximate cap on the events stream; acknowledged entries are otherwise
+# never removed. Keep it well above any expected processing backlog, since
+# trimming drops the oldest entries whether or not they were processed.
+EVENT_STREAM_MAXLEN = int(os.getenv("EVENT_STREAM_MAXLEN", "1000000"))
+
 # Caching
 CACHES = {
     "default": {
@@ -2,7 +2,11 @@
 API Key Authentication for Event Ingestion and Dashboard API
 """
 
+import hashlib
 import logging
+import re
+
+from django.core.cache import cache
 
 from rest_framework import authentication, exceptions
 
@@ -10,6 +14,114 @@ from projects.models import Project
 
 logger = logging.getLogger(__name__)
 
+# Short TTL keeps deactivated projects from authenticating for long even if an
+# invalidation is missed; saves invalidate explicitly (see events.signals)
+PROJECT_CACHE_TIMEOUT = 30
+
+# Unknown keys are remembered so repeated bad credentials skip the database
+INVALID_KEY_CACHE_TIMEOUT = 60
+INVALID_KEY_MARKER = "invalid"
+
+# Project fields read on the authenticated request path (views, throttling,
+# sampling); anything else is loaded lazily on access
+PROJECT_AUTH_FIELDS = (
+    "id",
+    "name",
+    "is_active",
+    "public_api_key",
+    "private_api_key",
+    "rate_limit_per_minute",
+    "sampling_enabled",
+    "sampling_rate",
+    "sampling_strategy",
+)
+
+# Generated keys are a prefix plus secrets.token_urlsafe() and fit the 64-char
+# key columns; anything else cannot match a project and skips the lookup
+API_KEY_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+BEARER_PREFIXES = ("Bearer ", "bearer ")
+
+
+def project_cache_key(field: str, api_key: str) -> str:
+    """
+    Cache key for a project looked up by one of its API key fields. The key is
+    hashed so raw API keys never appear in cache key names.
+    """
+    return f"proj:{field}:{hashlib.sha256(api_key.encode()).hexdigest()}"
+
+
+def invalidate_project_cache(*api_keys: tuple[str, str]) -> None:
+    """Drop cached project lookups for the given (field, api_key) pairs"""
+    keys = [project_cache_key(field, api_key) for field, api_key in api_keys]
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.error(f"Project cache invalidation error: {e}")
+
+
+def _cache_set(cache_key: str, value, timeout: int) -> None:
+    try:
+        cache.set(cache_key, value, timeout=timeout)
+    except Exception as e:
+        logger.error(f"Project cache write error: {e}")
+
+
+def _get_project_by_key(api_key: str, field: str) -> Project:
+    """
+    Look up an active project by API key, going through the cache first.
+    Raises Project.DoesNotExist if no active project owns the key.
+    """
+    if not API_KEY_PATTERN.fullmatch(api_key):
+        raise Project.DoesNotExist
+
+    cache_key = project_cache_key(field, api_key)
+
+    try:
+        cached = cache.get(cache_key)
+    except Exception as e:
+        # If the cache is unavailable, fall back to the database (fail open)
+        logger.error(f"Project cache read error: {e}")
+        cached = None
+
+    if cached == INVALID_KEY_MARKER:
+        raise Project.DoesNotExist
+    if cached is not None:
+        return cached
+
+    try:
+        project = Project.objects.only(*PROJECT_AUTH_FIELDS).get(
+            **{field: api_key, "is_active": True}
+        )
+    except Project.DoesNotExist:
+        _cache_set(cache_key, INVALID_KEY_MARKER, INVALID_KEY_CACHE_TIMEOUT)
+        raise
+
+    _cache_set(cache_key, project, PROJECT_CACHE_TIMEOUT)
+    return project
+
+
+def _get_bearer_token(auth_header: str) -> str | None:
+    """
+    Extract the token from a "Bearer <token>" Authorization header.
+    Returns None if the header uses another scheme.
+    """
+    # Fast path for the usual spellings: no split/lower allocations
+    if auth_header.startswith(BEARER_PREFIXES):
+        return auth_header[7:]
+
+    try:
+        scheme, token = auth_header.split(" ", 1)
+    except ValueError as e:
+        raise exceptions.AuthenticationFailed(
+            "Invalid authorization header format"
+        ) from e
+
+    if scheme.lower() != "bearer":
+        return None
+
+    return token
+
 
 class PublicApiKeyAuthentication(authentication.BaseAuthentication):
     """
@@ -22,28 +134,20 @@ class PublicApiKeyAuthentication(authentication.BaseAuthentication):
         Authenticate the request based on public API key.
         Returns (project, None) tuple if authentication succeeds.
         """
-        auth_header = request.headers.get("authorization")
+        auth_header = request.META.get("HTTP_AUTHORIZATION")
 
         if not auth_header:
             return None
 
-        try:
-            scheme, api_key = auth_header.split(" ", 1)
-        except ValueError as e:
-            raise exceptions.AuthenticationFailed(
-                "Invalid authorization header format"
-            ) from e
-
-        if scheme.lower() != "bearer":
+        api_key = _get_bearer_token(auth_header)
+        if api_key is None:
             return None
 
         if not api_key.startswith("sa_"):
             raise exceptions.AuthenticationFailed("Invalid API key format")
 
         try:
-            project = Project.objects.select_related("owner").get(
-                public_api_key=api_key, is_active=True
-            )
+            project = _get_project_by_key(api_key, "public_api_key")
         except Project.DoesNotExist as e:
             logger.warning(f"Invalid public API key attempted: {api_key[:10]}...")
             raise exceptions.AuthenticationFailed("Invalid API key") from e
@@ -74,28 +178,20 @@ class PrivateApiKeyAuthentication(authentication.BaseAuthentication):
         Authenticate the request based on private API key.
         Returns (project, None) tuple if authentication succeeds.
         """
-        auth_header = request.headers.get("authorization")
+        auth_header = request.META.get("HTTP_AUTHORIZATION")
 
         if not auth_header:
             return None
 
-        try:
-            scheme, api_key = auth_header.split(" ", 1)
-        except ValueError as e:
-            raise exceptions.AuthenticationFailed(
-                "Invalid authorization header format"
-            ) from e
-
-        if scheme.lower() != "bearer":
+        api_key = _get_bearer_token(auth_header)
+        if api_key is None:
             return None
 
         if not api_key.startswith("sa_priv_"):
             raise exceptions.AuthenticationFailed("Invalid private API key format")
 
         try:
-            project = Project.objects.select_related("owner").get(
-                private_api_key=api_key, is_active=True
-            )
+            project = _get_project_by_key(api_key, "private_api_key")
         except Project.DoesNotExist as e:
             logger.warning(f"Invalid private API key attempted: {api_key[:10]}...")
             raise exceptions.AuthenticationFailed("Invalid API key") from e
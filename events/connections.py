@@ -0,0 +1,32 @@
+"""
+Shared Redis connections for the events app
+"""
+
+from django.conf import settings
+
+import redis
+
+# One pool per Redis URL, shared by every client created in this process
+_connection_pools: dict[str, redis.ConnectionPool] = {}
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Return a Redis client for settings.REDIS_URL backed by a process-wide
+    connection pool, so callers reuse open connections instead of reconnecting.
+    """
+    url = settings.REDIS_URL
+    pool = _connection_pools.get(url)
+    if pool is None:
+        pool = _connection_pools.setdefault(
+            url,
+            redis.ConnectionPool.from_url(
+                url,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                # Pooled sockets can sit idle between requests; probe them
+                # before reuse rather than failing on a dropped connection
+                health_check_interval=30,
+                socket_keepalive=True,
+            ),
+        )
+    return redis.Redis(connection_pool=pool)
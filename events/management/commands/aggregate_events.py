@@ -1,11 +1,29 @@
 """
 Django management command to run event aggregation jobs
 """
-from datetime import datetime, date
+from datetime import date, datetime
+
 from django.core.management.base import BaseCommand
 from django_rq import get_queue
+from rq import Queue
+from rq.job import Job, JobStatus
+
+from events.workers import (
+    aggregate_5min_events_job,
+    aggregate_daily_events_job,
+    aggregate_hourly_events_job,
+    previous_5min_window,
+    previous_day,
+    previous_hour,
+)
 
-from events.workers import aggregate_daily_events_job, aggregate_hourly_events_job, aggregate_5min_events_job
+# Job states in which an aggregation window is still going to be (re)computed
+PENDING_STATUSES = (
+    JobStatus.QUEUED,
+    JobStatus.STARTED,
+    JobStatus.DEFERRED,
+    JobStatus.SCHEDULED,
+)
 
 
 class Command(BaseCommand):
@@ -53,55 +71,62 @@ class Command(BaseCommand):
 
         queue = get_queue(queue_name)
         jobs_enqueued = []
+        # (agg_type, label, window, job data) for each requested aggregation
+        planned = []
 
         try:
             if agg_type in ['daily', 'all']:
                 # Daily aggregation
-                target_date = None
                 if date_str:
                     target_date = date.fromisoformat(date_str)
+                else:
+                    target_date = previous_day()
                 
-                job = queue.enqueue(
+                planned.append(('daily', 'Daily', target_date.isoformat(), Queue.prepare_data(
                     aggregate_daily_events_job,
-                    date=target_date,
-                    job_timeout=1800  # 30 minutes
-                )
-                jobs_enqueued.append(('daily', job.id))
-                
-                date_display = target_date.isoformat() if target_date else 'yesterday'
-                self.stdout.write(f"✓ Daily aggregation job enqueued for {date_display}: {job.id}")
+                    kwargs={'date': target_date},
+                    timeout=1800,  # 30 minutes
+                    result_ttl=0,
+                    job_id=f"aggregate_daily_{target_date:%Y%m%d}",
+                )))
 
             if agg_type in ['hourly', 'all']:
                 # Hourly aggregation
-                target_hour = None
                 if hour_str:
                     target_hour = datetime.fromisoformat(hour_str + ':00:00')
+                else:
+                    target_hour = previous_hour()
                 
-                job = queue.enqueue(
+                planned.append(('hourly', 'Hourly', target_hour.isoformat(), Queue.prepare_data(
                     aggregate_hourly_events_job,
-                    datetime_hour=target_hour,
-                    job_timeout=900  # 15 minutes
-                )
-                jobs_enqueued.append(('hourly', job.id))
-                
-                hour_display = target_hour.isoformat() if target_hour else 'previous hour'
-                self.stdout.write(f"✓ Hourly aggregation job enqueued for {hour_display}: {job.id}")
+                    kwargs={'datetime_hour': target_hour},
+                    timeout=900,  # 15 minutes
+                    result_ttl=0,
+                    job_id=f"aggregate_hourly_{target_hour:%Y%m%d%H}",
+                )))
 
             if agg_type in ['5min', 'all']:
                 # 5-minute aggregation
-                target_5min = None
                 if fivemin_str:
                     target_5min = datetime.fromisoformat(fivemin_str + ':00')
-                
-                job = queue.enqueue(
-                    aggregate_5min_events_job,
-                    datetime_5min=target_5min,
-                    job_timeout=300  # 5 minutes
+                else:
+                    target_5min = previous_5min_window()
+                # Round to the window boundary so equivalent times share a job ID
+                target_5min = target_5min.replace(
+                    minute=(target_5min.minute // 5) * 5, second=0, microsecond=0
                 )
-                jobs_enqueued.append(('5min', job.id))
                 
-                fivemin_display = target_5min.isoformat() if target_5min else 'previous 5-min window'
-                self.stdout.write(f"✓ 5-minute aggregation job enqueued for {fivemin_display}: {job.id}")
+                planned.append(('5min', '5-minute', target_5min.isoformat(), Queue.prepare_data(
+                    aggregate_5min_events_job,
+                    kwargs={'datetime_5min': target_5min},
+                    timeout=300,  # 5 minutes
+                    result_ttl=0,
+                    job_id=f"aggregate_5min_{target_5min:%Y%m%d%H%M}",
+                )))
+
+            jobs = self.enqueue_pending(queue, [data for *_, data in planned])
+            for (agg_type, label, window, _), job in zip(planned, jobs, strict=True):
+                self.report_job(agg_type, label, window, job, jobs_enqueued)
 
             self.stdout.write("")
             self.stdout.write(self.style.SUCCESS(f"Enqueued {len(jobs_enqueued)} aggregation jobs"))
@@ -111,4 +136,35 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f"Error enqueuing aggregation jobs: {str(e)}")
             )
-            raise
\ No newline at end of file
+            raise
+
+    def enqueue_pending(self, queue, job_datas):
+        """
+        Enqueue aggregation jobs under their deterministic IDs, skipping any whose
+        window already has a job waiting or running. Existing jobs are fetched and
+        new ones enqueued in one round-trip each. Returns a job (or None when
+        skipped) per entry in job_datas.
+        """
+        existing = Job.fetch_many(
+            [data.job_id for data in job_datas],
+            connection=queue.connection,
+            serializer=queue.serializer,
+        )
+        to_enqueue = [
+            data for data, job in zip(job_datas, existing, strict=True)
+            if job is None or job.get_status(refresh=False) not in PENDING_STATUSES
+        ]
+
+        enqueued = {job.id: job for job in queue.enqueue_many(to_enqueue)} if to_enqueue else {}
+        return [enqueued.get(data.job_id) for data in job_datas]
+
+    def report_job(self, agg_type, label, window, job, jobs_enqueued):
+        """Write whether the job for an aggregation window was enqueued or skipped"""
+        if job is None:
+            self.stdout.write(
+                self.style.WARNING(f"⚠ {label} aggregation for {window} already queued, skipped")
+            )
+            return
+
+        jobs_enqueued.append((agg_type, job.id))
+        self.stdout.write(f"✓ {label} aggregation job enqueued for {window}: {job.id}")
@@ -1,11 +1,17 @@
 """
 Django management command to check event processing status
 """
+from collections import defaultdict
+from datetime import timedelta
+
 import redis
 from django.core.management.base import BaseCommand
-from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
 from django_rq import get_queue
+from rq.registry import FailedJobRegistry
 
+from events.connections import get_redis_client
 from events.models import Event
 from projects.models import Project
 
@@ -33,10 +39,18 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("=== Event Processing Status ==="))
         self.stdout.write("")
 
-        # Check Redis connection
+        # Probe Redis in a single round trip; per-command errors come back as
+        # exception objects instead of being raised
+        stream_key = "events:queue"
         try:
-            redis_client = redis.from_url(settings.REDIS_URL)
-            redis_info = redis_client.info()
+            redis_client = get_redis_client()
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.info()
+            pipe.xlen(stream_key)
+            pipe.xinfo_groups(stream_key)
+            redis_info, stream_length, groups = pipe.execute(raise_on_error=False)
+            if isinstance(redis_info, Exception):
+                raise redis_info
             self.stdout.write(f"✓ Redis: Connected (version {redis_info['redis_version']})")
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"✗ Redis: Connection failed - {e}"))
@@ -44,13 +58,14 @@ class Command(BaseCommand):
 
         # Check Redis stream
         try:
-            stream_key = "events:queue"
-            stream_length = redis_client.xlen(stream_key)
+            if isinstance(stream_length, Exception):
+                raise stream_length
             self.stdout.write(f"✓ Event Stream: {stream_length} events pending")
             
             # Check consumer group
-            try:
-                groups = redis_client.xinfo_groups(stream_key)
+            if isinstance(groups, redis.ResponseError):
+                self.stdout.write(self.style.WARNING("⚠ Consumer Group: Stream does not exist"))
+            else:
                 for group in groups:
                     if group['name'] == b'event_processors':
                         pending = group['pending']
@@ -59,8 +74,6 @@ class Command(BaseCommand):
                         break
                 else:
                     self.stdout.write(self.style.WARNING("⚠ Consumer Group: Not found"))
-            except redis.ResponseError:
-                self.stdout.write(self.style.WARNING("⚠ Consumer Group: Stream does not exist"))
                 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"✗ Event Stream: Error checking - {e}"))
@@ -68,12 +81,11 @@ class Command(BaseCommand):
         # Check RQ queue
         try:
             queue = get_queue(queue_name)
-            job_count = len(queue.jobs)
+            job_count = queue.count
             self.stdout.write(f"✓ RQ Queue ({queue_name}): {job_count} jobs queued")
             
             # Check for failed jobs
-            failed_queue = get_queue('failed')
-            failed_count = len(failed_queue.jobs)
+            failed_count = FailedJobRegistry(queue=queue).count
             if failed_count > 0:
                 self.stdout.write(self.style.WARNING(f"⚠ Failed Jobs: {failed_count}"))
             else:
@@ -86,24 +98,20 @@ class Command(BaseCommand):
 
         # Database statistics
         try:
-            total_events = Event.objects.count()
+            now = timezone.now()
+            stats = Event.objects.aggregate(
+                total=Count('id'),
+                last_hour=Count('id', filter=Q(timestamp__gte=now - timedelta(hours=1))),
+                last_day=Count('id', filter=Q(timestamp__gte=now - timedelta(days=1))),
+                latest=Max('timestamp'),
+            )
+            total_events = stats['total']
             self.stdout.write(f"📊 Total Events: {total_events:,}")
             
             if total_events > 0:
-                # Recent events
-                from django.utils import timezone
-                from datetime import timedelta
-                
-                now = timezone.now()
-                last_hour = Event.objects.filter(timestamp__gte=now - timedelta(hours=1)).count()
-                last_day = Event.objects.filter(timestamp__gte=now - timedelta(days=1)).count()
-                
-                self.stdout.write(f"📊 Events (last hour): {last_hour:,}")
-                self.stdout.write(f"📊 Events (last 24h): {last_day:,}")
-                
-                # Latest event
-                latest_event = Event.objects.latest('timestamp')
-                self.stdout.write(f"📊 Latest Event: {latest_event.timestamp}")
+                self.stdout.write(f"📊 Events (last hour): {stats['last_hour']:,}")
+                self.stdout.write(f"📊 Events (last 24h): {stats['last_day']:,}")
+                self.stdout.write(f"📊 Latest Event: {stats['latest']}")
                 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"✗ Database Stats: Error - {e}"))
@@ -113,19 +121,38 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("=== Project Details ==="))
             
             try:
-                for project in Project.objects.filter(is_active=True):
-                    event_count = Event.objects.filter(project=project).count()
-                    self.stdout.write(f"📁 {project.name}: {event_count:,} events")
+                # Gather per-project stats up front so the loop runs no queries
+                project_stats = {
+                    row['project_id']: row
+                    for row in Event.objects.values('project_id').annotate(
+                        event_count=Count('id'), latest=Max('timestamp')
+                    ).order_by()
+                }
+                project_sources = defaultdict(list)
+                for project_id, source_name in (
+                    Event.objects.filter(event_source__isnull=False)
+                    .values_list('project_id', 'event_source__name')
+                    .distinct()
+                    .order_by()
+                ):
+                    project_sources[project_id].append(source_name)
+
+                # Only the name is printed, so skip model instantiation entirely
+                active_projects = (
+                    Project.objects.filter(is_active=True)
+                    .values_list('id', 'name')
+                    .iterator(chunk_size=500)
+                )
+                for project_id, project_name in active_projects:
+                    row = project_stats.get(project_id)
+                    event_count = row['event_count'] if row else 0
+                    self.stdout.write(f"📁 {project_name}: {event_count:,} events")
                     
                     if event_count > 0:
-                        latest = Event.objects.filter(project=project).latest('timestamp')
-                        self.stdout.write(f"   Latest: {latest.timestamp}")
+                        self.stdout.write(f"   Latest: {row['latest']}")
                         
                         # Event sources
-                        sources = Event.objects.filter(project=project).values_list(
-                            'event_source__name', flat=True
-                        ).distinct()
-                        source_list = [s for s in sources if s]
+                        source_list = project_sources.get(project_id)
                         if source_list:
                             self.stdout.write(f"   Sources: {', '.join(source_list)}")
                             
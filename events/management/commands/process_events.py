@@ -2,10 +2,13 @@
 Django management command to process events from Redis streams using RQ
 """
 import time
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django_rq import get_queue
+from rq.exceptions import InvalidJobOperation
+from rq.job import JobStatus
 
-from events.workers import process_events_job
+from events.workers import EventProcessor, process_events_job
 
 
 class Command(BaseCommand):
@@ -15,8 +18,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=50,
-            help='Number of events to process per batch (default: 50)'
+            default=None,
+            help='Number of events to process per batch (default: EVENT_BULK_BATCH_SIZE)'
         )
         parser.add_argument(
             '--max-batches',
@@ -28,7 +31,7 @@ class Command(BaseCommand):
             '--interval',
             type=int,
             default=5,
-            help='Seconds to wait between job enqueues (default: 5)'
+            help='Maximum seconds to wait for new events between checks (default: 5)'
         )
         parser.add_argument(
             '--once',
@@ -43,7 +46,7 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        batch_size = options['batch_size']
+        batch_size = options['batch_size'] or settings.EVENT_BULK_BATCH_SIZE
         max_batches = options['max_batches']
         interval = options['interval']
         once = options['once']
@@ -74,11 +77,29 @@ class Command(BaseCommand):
                     self.style.SUCCESS(f"Enqueued job: {job.id}")
                 )
             else:
-                # Continuous mode
+                # Continuous mode: only enqueue a job when events are waiting
                 self.stdout.write("Press Ctrl+C to stop")
+                processor = EventProcessor()
+                job = None
                 job_count = 0
                 
                 while True:
+                    if job is not None:
+                        try:
+                            status = job.get_status()
+                        except InvalidJobOperation:
+                            # Finished jobs are deleted once their result_ttl
+                            # expires, so a missing job is done
+                            job = None
+                        else:
+                            if status in (JobStatus.QUEUED, JobStatus.STARTED):
+                                # Previous job still has the backlog in hand
+                                time.sleep(interval)
+                                continue
+
+                    if not processor.wait_for_events(timeout=interval * 1000):
+                        continue
+
                     job = queue.enqueue(
                         process_events_job,
                         batch_size=batch_size,
@@ -91,8 +112,6 @@ class Command(BaseCommand):
                         f"Enqueued job #{job_count}: {job.id}"
                     )
                     
-                    time.sleep(interval)
-                    
         except KeyboardInterrupt:
             self.stdout.write(
                 self.style.WARNING("\nStopping event processor...")
@@ -4,17 +4,91 @@ Usage: python manage.py test_event_ingestion --project-name "Test Project"
 """
 
 import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Any
-from uuid import uuid4
 
 from django.core.management.base import BaseCommand
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from projects.models import Project
 
+# Test data templates
+EVENT_TEMPLATES = (
+    {
+        "event_name": "page_view",
+        "event_source": "web_app",
+        "properties": {
+            "page": "/dashboard",
+            "referrer": "https://google.com",
+            "screen_resolution": "1920x1080",
+        },
+    },
+    {
+        "event_name": "button_click",
+        "event_source": "web_app",
+        "properties": {
+            "button_id": "signup_btn",
+            "section": "header",
+            "experiment_variant": "blue_button",
+        },
+    },
+    {
+        "event_name": "user_signup",
+        "event_source": "web_app",
+        "properties": {
+            "signup_method": "email",
+            "plan": "free",
+            "utm_source": "google",
+        },
+    },
+    {
+        "event_name": "api_request",
+        "event_source": "backend",
+        "properties": {
+            "endpoint": "/api/users",
+            "method": "GET",
+            "response_time_ms": 45,
+            "status_code": 200,
+        },
+    },
+    {
+        "event_name": "mobile_app_open",
+        "event_source": "mobile_app",
+        "properties": {
+            "app_version": "1.2.3",
+            "os": "iOS",
+            "os_version": "17.1",
+            "is_first_open": False,
+        },
+    },
+)
+
+
+def build_body_template(template: dict[str, Any]) -> str:
+    """Encode an event template as JSON with placeholders for varying fields"""
+    return json.dumps(
+        {
+            **template,
+            "event_id": "__EVENT_ID__",
+            "user_id": "__USER_ID__",
+            "session_id": "__SESSION_ID__",
+            "properties": {
+                **template.get("properties", {}),
+                "test_index": "__TEST_INDEX__",
+                "timestamp": "__TIMESTAMP__",
+            },
+        }
+    )
+
+
+# Encode each template once; events only fill in the varying fields
+BODY_TEMPLATES = tuple(build_body_template(t) for t in EVENT_TEMPLATES)
+
 
 class Command(BaseCommand):
     help = "Test the event ingestion API with sample data"
@@ -38,6 +112,18 @@ class Command(BaseCommand):
         parser.add_argument(
             "--delay", type=float, help="Delay between events in seconds", default=0.5
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Number of events to send in parallel (delay is ignored above 1)",
+            default=1,
+        )
+        parser.add_argument(
+            "--bulk-size",
+            type=int,
+            help="Send events in batches of this size via the bulk endpoint",
+            default=1,
+        )
         parser.add_argument(
             "--verbose", action="store_true", help="Show detailed output"
         )
@@ -47,6 +133,8 @@ class Command(BaseCommand):
         base_url = options["base_url"].rstrip("/")
         num_events = options["num_events"]
         delay = options["delay"]
+        concurrency = max(1, options["concurrency"])
+        bulk_size = max(1, options["bulk_size"])
         verbose = options["verbose"]
 
         # Get or create test project
@@ -54,63 +142,20 @@ class Command(BaseCommand):
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Using project: {project.name} (API Key: {project.api_key})"
+                f"Using project: {project.name} (API Key: {project.public_api_key})"
             )
         )
 
+        # Reuse one keep-alive session for every event
+        self.session = self.create_session(project.public_api_key)
+
         # Test endpoint URL
         endpoint = f"{base_url}/api/events/ingest/"
 
-        # Test data templates
-        event_templates = [
-            {
-                "event_name": "page_view",
-                "event_source": "web_app",
-                "properties": {
-                    "page": "/dashboard",
-                    "referrer": "https://google.com",
-                    "screen_resolution": "1920x1080",
-                },
-            },
-            {
-                "event_name": "button_click",
-                "event_source": "web_app",
-                "properties": {
-                    "button_id": "signup_btn",
-                    "section": "header",
-                    "experiment_variant": "blue_button",
-                },
-            },
-            {
-                "event_name": "user_signup",
-                "event_source": "web_app",
-                "properties": {
-                    "signup_method": "email",
-                    "plan": "free",
-                    "utm_source": "google",
-                },
-            },
-            {
-                "event_name": "api_request",
-                "event_source": "backend",
-                "properties": {
-                    "endpoint": "/api/users",
-                    "method": "GET",
-                    "response_time_ms": 45,
-                    "status_code": 200,
-                },
-            },
-            {
-                "event_name": "mobile_app_open",
-                "event_source": "mobile_app",
-                "properties": {
-                    "app_version": "1.2.3",
-                    "os": "iOS",
-                    "os_version": "17.1",
-                    "is_first_open": False,
-                },
-            },
-        ]
+        # Draw random event_id suffixes for the whole run in one call
+        self.event_id_suffixes = os.urandom(4 * num_events).hex()
+        self._timestamp = ""
+        self._timestamp_at = -1.0
 
         # Send test events
         success_count = 0
@@ -119,38 +164,79 @@ class Command(BaseCommand):
         self.stdout.write(f"Sending {num_events} test events to {endpoint}")
         self.stdout.write("-" * 60)
 
-        for i in range(num_events):
-            # Select event template cyclically
-            template = event_templates[i % len(event_templates)]
+        if bulk_size > 1:
+            self.stdout.write(f"Bulk size: {bulk_size} events per request")
+            bulk_endpoint = f"{endpoint}bulk/"
 
-            # Create event data with some variation
-            event_data = self.create_event_data(template, i)
+            for start in range(0, num_events, bulk_size):
+                indexes = range(start, min(start + bulk_size, num_events))
+                batch = [
+                    self.create_event_body(BODY_TEMPLATES[i % len(BODY_TEMPLATES)], i)
+                    for i in indexes
+                ]
 
-            # Send event
-            success, response_data, status_code = self.send_event(
-                endpoint, project.api_key, event_data
-            )
-
-            if success:
-                success_count += 1
-                if verbose:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"✓ Event {i + 1}: {event_data['event_name']}"
-                        )
-                    )
-                else:
-                    self.stdout.write(self.style.SUCCESS("."), ending="")
-            else:
-                error_count += 1
-                self.stdout.write(
-                    self.style.ERROR(
-                        f"✗ Event {i + 1} failed ({status_code}): {response_data}"
+                if bulk_endpoint:
+                    result = self.send_event(
+                        bulk_endpoint, '{"events": [' + ",".join(batch) + "]}"
                     )
+                    if result[2] == 404:
+                        # Server without the bulk endpoint, send one by one
+                        self.stdout.write(
+                            self.style.WARNING(
+                                "Bulk endpoint not found, sending single events"
+                            )
+                        )
+                        bulk_endpoint = None
+
+                for i, body in zip(indexes, batch, strict=True):
+                    if not bulk_endpoint:
+                        result = self.send_event(endpoint, body)
+
+                    event_name = EVENT_TEMPLATES[i % len(EVENT_TEMPLATES)]["event_name"]
+                    if self.report_result(i, event_name, *result, verbose):
+                        success_count += 1
+                    else:
+                        error_count += 1
+
+                if delay > 0 and indexes[-1] < num_events - 1:
+                    time.sleep(delay)
+        elif concurrency > 1:
+            self.stdout.write(f"Concurrency: {concurrency} workers")
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {}
+                for i in range(num_events):
+                    body_template = BODY_TEMPLATES[i % len(BODY_TEMPLATES)]
+                    body = self.create_event_body(body_template, i)
+                    future = executor.submit(self.send_event, endpoint, body)
+                    futures[future] = i
+
+                for future in as_completed(futures):
+                    i = futures[future]
+                    event_name = EVENT_TEMPLATES[i % len(EVENT_TEMPLATES)]["event_name"]
+                    if self.report_result(i, event_name, *future.result(), verbose):
+                        success_count += 1
+                    else:
+                        error_count += 1
+        else:
+            for i in range(num_events):
+                # Select event template cyclically
+                template = EVENT_TEMPLATES[i % len(EVENT_TEMPLATES)]
+
+                # Create event body with some variation
+                body = self.create_event_body(
+                    BODY_TEMPLATES[i % len(BODY_TEMPLATES)], i
                 )
 
-            if delay > 0 and i < num_events - 1:
-                time.sleep(delay)
+                # Send event
+                result = self.send_event(endpoint, body)
+
+                if self.report_result(i, template["event_name"], *result, verbose):
+                    success_count += 1
+                else:
+                    error_count += 1
+
+                if delay > 0 and i < num_events - 1:
+                    time.sleep(delay)
 
         # Summary
         if not verbose:
@@ -167,71 +253,114 @@ class Command(BaseCommand):
         if error_count > 0:
             self.stdout.write(self.style.ERROR(f"✗ {error_count} events failed"))
 
-    def get_or_create_project(self, project_name: str) -> Project:
-        """Get or create a test project"""
-        try:
-            project = Project.objects.get(name=project_name)
-            self.stdout.write(f"Found existing project: {project_name}")
-        except Project.DoesNotExist:
-            from django.contrib.auth.models import User
-
-            # Get or create a test user (owner)
-            owner, created = User.objects.get_or_create(
-                username="test_owner",
-                defaults={
-                    "email": "test@example.com",
-                    "first_name": "Test",
-                    "last_name": "Owner",
-                },
+    def report_result(
+        self,
+        index: int,
+        event_name: str,
+        success: bool,
+        response_data: dict[str, Any] | None,
+        status_code: int,
+        verbose: bool,
+    ) -> bool:
+        """Write the outcome of a single event send, returning whether it succeeded"""
+        if success:
+            if verbose:
+                self.stdout.write(
+                    self.style.SUCCESS(f"✓ Event {index + 1}: {event_name}")
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS("."), ending="")
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"✗ Event {index + 1} failed ({status_code}): {response_data}"
+                )
             )
 
-            # Create project
-            project = Project.objects.create(
-                name=project_name,
-                description="Test project created by management command",
-                owner=owner,
-                sampling_enabled=True,
-                sampling_rate=1.0,  # Don't sample out any events for testing
-                sampling_strategy="random",
-                rate_limit_per_minute=1000,  # High limit for testing
-            )
+        return success
 
+    def get_or_create_project(self, project_name: str) -> Project:
+        """Get or create a test project"""
+        project, created = Project.objects.get_or_create(
+            name=project_name,
+            defaults={
+                "description": "Test project created by management command",
+                # Callable so the owner is only looked up when creating
+                "owner": self.get_or_create_owner,
+                "sampling_enabled": True,
+                "sampling_rate": 1.0,  # Don't sample out any events for testing
+                "sampling_strategy": "random",
+                "rate_limit_per_minute": 1000,  # High limit for testing
+            },
+        )
+
+        if created:
             self.stdout.write(
                 self.style.SUCCESS(f"Created new project: {project_name}")
             )
+        else:
+            self.stdout.write(f"Found existing project: {project_name}")
 
         return project
 
-    def create_event_data(self, template: dict[str, Any], index: int) -> dict[str, Any]:
-        """Create event data based on template with some variation"""
-        event_data = template.copy()
+    def get_or_create_owner(self):
+        """Get or create the test user that owns created projects"""
+        from django.contrib.auth.models import User
 
-        # Add some variation
-        event_data["event_id"] = f"test_event_{index}_{uuid4().hex[:8]}"
-        event_data["user_id"] = f"test_user_{(index % 3) + 1}"  # Cycle through 3 users
-        event_data["session_id"] = (
-            f"test_session_{(index // 2) + 1}"  # New session every 2 events
+        owner, _ = User.objects.get_or_create(
+            username="test_owner",
+            defaults={
+                "email": "test@example.com",
+                "first_name": "Test",
+                "last_name": "Owner",
+            },
+        )
+        return owner
+
+    def create_event_body(self, body_template: str, index: int) -> str:
+        """Create a JSON event body from an encoded template with some variation"""
+        suffix = self.event_id_suffixes[index * 8 : (index + 1) * 8]
+        user_id = f"test_user_{(index % 3) + 1}"  # Cycle through 3 users
+        session_id = f"test_session_{(index // 2) + 1}"  # New session every 2 events
+
+        return (
+            body_template.replace("__EVENT_ID__", f"test_event_{index}_{suffix}")
+            .replace("__USER_ID__", user_id)
+            .replace("__SESSION_ID__", session_id)
+            .replace('"__TEST_INDEX__"', str(index))
+            .replace("__TIMESTAMP__", self.current_timestamp())
+        )
+
+    def current_timestamp(self) -> str:
+        """Client timestamp for event properties, refreshed at most once a second"""
+        now = time.monotonic()
+        if now - self._timestamp_at >= 1:
+            self._timestamp = datetime.now().isoformat()
+            self._timestamp_at = now
+        return self._timestamp
+
+    def create_session(self, api_key: str) -> requests.Session:
+        """Create an HTTP session with auth headers and a pooled keep-alive adapter"""
+        session = requests.Session()
+        session.headers.update(
+            {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            }
         )
 
-        # Add index to properties for uniqueness
-        if "properties" not in event_data:
-            event_data["properties"] = {}
-        event_data["properties"]["test_index"] = index
-        event_data["properties"]["timestamp"] = datetime.now().isoformat()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=64)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
 
-        return event_data
+        return session
 
     def send_event(
-        self, url: str, api_key: str, event_data: dict[str, Any]
+        self, url: str, body: str
     ) -> tuple[bool, dict[str, Any] | None, int]:
-        """Send a single event to the API"""
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-
+        """Send a pre-encoded JSON body to the API"""
         try:
-            response = requests.post(url, headers=headers, json=event_data, timeout=10)
+            response = self.session.post(url, data=body.encode(), timeout=10)
 
             try:
                 response_data = response.json()
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:02
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so ingestion isn't blocked on the table lock
+    atomic = False
+
+    dependencies = [
+        ("events", "0003_fiveminuteeventaggregation"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="event",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["event_properties"],
+                name="events_props_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
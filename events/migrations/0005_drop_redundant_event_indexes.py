@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:04
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are dropped concurrently so ingestion isn't blocked on the table lock
+    atomic = False
+
+    dependencies = [
+        ("events", "0004_event_properties_gin_index"),
+    ]
+
+    operations = [
+        # Covered by the (project, event_name, timestamp) index
+        RemoveIndexConcurrently(
+            model_name="event",
+            name="events_project_d71488_idx",
+        ),
+        # event_name is only ever filtered within a project, which the
+        # composite indexes cover; drop the field index and its _like variant
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        "DROP INDEX CONCURRENTLY IF EXISTS events_event_name_83ed1fb8",
+                        "DROP INDEX CONCURRENTLY IF EXISTS "
+                        "events_event_name_83ed1fb8_like",
+                    ],
+                    reverse_sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                        "events_event_name_83ed1fb8 ON events (event_name)",
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                        "events_event_name_83ed1fb8_like "
+                        "ON events (event_name varchar_pattern_ops)",
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="event",
+                    name="event_name",
+                    field=models.CharField(max_length=255),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:07
+
+import events.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0005_drop_redundant_event_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="event",
+            name="id",
+            field=models.UUIDField(
+                default=events.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
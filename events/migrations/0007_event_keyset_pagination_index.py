@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:27
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so ingestion isn't blocked on the table lock
+    atomic = False
+
+    dependencies = [
+        ("events", "0006_event_uuid7_ids"),
+    ]
+
+    operations = [
+        # Matches the event query API's (-timestamp, -id) cursor ordering
+        AddIndexConcurrently(
+            model_name="event",
+            index=models.Index(
+                fields=["project", "-timestamp", "-id"],
+                name="events_project_55ad0a_idx",
+            ),
+        ),
+        # Covered by the new index
+        RemoveIndexConcurrently(
+            model_name="event",
+            name="events_project_542748_idx",
+        ),
+    ]
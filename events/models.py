@@ -1,6 +1,12 @@
+import functools
 import hashlib
+import os
+import time as time_module
 import uuid
+from collections import Counter
+from datetime import datetime, time, timedelta
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils import timezone
 
@@ -14,9 +20,36 @@ from .models_aggregation import (  # noqa: F401
 )
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (version 7, RFC 9562): a 48-bit Unix millisecond timestamp
+    followed by random bits, so new primary keys land on the right edge of the
+    B-tree instead of random pages
+    """
+    value = (time_module.time_ns() // 1_000_000) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _project_salt(project_id) -> str:
+    # Formatting a UUID costs more than the rest of the hash input, so do it
+    # once per project
+    return f"|{project_id}"
+
+
+def hash_user_id(ip_address: str, user_agent: str, project_id) -> str:
+    """Fallback user ID hashed from IP + User Agent, salted with the project ID"""
+    data = f"{ip_address}|{user_agent}{_project_salt(project_id)}"
+    # Hex-encode only the 8 bytes kept, same value as hexdigest()[:16]
+    return f"hash_{hashlib.sha256(data.encode()).digest()[:8].hex()}"
+
+
 class Event(models.Model):
     # Primary identifiers
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event_id = models.CharField(
         max_length=255, null=True, blank=True, help_text="Client-provided event ID"
     )
@@ -34,7 +67,7 @@ class Event(models.Model):
     )
 
     # Core event data
-    event_name = models.CharField(max_length=255, db_index=True)
+    event_name = models.CharField(max_length=255)
     event_properties = models.JSONField(
         default=dict, help_text="Flexible event data storage"
     )
@@ -58,20 +91,29 @@ class Event(models.Model):
         db_table = "events"
         indexes = [
             # Primary query indexes
-            models.Index(fields=["project", "timestamp"]),
+            # Also serves the keyset pagination order of the event query API
+            models.Index(fields=["project", "-timestamp", "-id"]),
             models.Index(fields=["project", "event_name", "timestamp"]),
             models.Index(fields=["project", "event_source", "timestamp"]),
             models.Index(fields=["project", "user_id", "timestamp"]),
             models.Index(fields=["project", "session_id", "timestamp"]),
             # Analytics indexes
-            models.Index(fields=["project", "event_name"]),
             models.Index(fields=["timestamp"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["processed_at"]),
+            # Property containment filters (event_properties @> {...})
+            GinIndex(
+                fields=["event_properties"],
+                name="events_props_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
         ]
 
         # Partition-ready for future scaling
-        # When we scale, we can partition by (project_id, timestamp)
+        # When we scale, we can partition by (project_id, timestamp). Postgres
+        # requires the partition key in every unique index, so the primary key
+        # must first become (id, timestamp), e.g. via CompositePrimaryKey.
+        # Retention could then detach old partitions instead of DELETEing rows.
 
     def __str__(self):
         return f"{self.project.name} - {self.event_name} - {self.timestamp}"
@@ -85,9 +127,8 @@ class Event(models.Model):
         if not self.session_id and self.user_id:
             self.session_id = self._generate_session_id()
 
-        # Update event source last activity
-        if self.event_source and not self.pk:  # Only on creation
-            self.event_source.update_last_event_time()
+        # Event source activity is recorded in batches by the stream worker
+        # (EventProcessor.touch_event_sources), not with an UPDATE per event
 
         super().save(*args, **kwargs)
 
@@ -100,9 +141,7 @@ class Event(models.Model):
             return f"anonymous_{uuid.uuid4().hex[:12]}"
 
         # Create a hash of IP + User Agent + project ID for consistency
-        data = f"{self.ip_address}|{self.user_agent}|{self.project.id}"
-        hash_obj = hashlib.sha256(data.encode())
-        return f"hash_{hash_obj.hexdigest()[:16]}"
+        return hash_user_id(self.ip_address, self.user_agent, self.project_id)
 
     def _generate_session_id(self):
         """
@@ -111,15 +150,10 @@ class Event(models.Model):
         if not self.user_id:
             return None
 
-        # Round timestamp to 60-minute windows
+        # 60-minute window as YYYYMMDDHH, formatted directly rather than
+        # through replace() + strftime()
         ts = self.timestamp or timezone.now()
-        window_start = ts.replace(minute=0, second=0, microsecond=0)
-
-        # If we're past 60 minutes, round to next hour
-        if ts.minute >= 60:
-            window_start = window_start.replace(hour=window_start.hour + 1)
-
-        window_str = window_start.strftime("%Y%m%d%H")
+        window_str = f"{ts.year:04d}{ts.month:02d}{ts.day:02d}{ts.hour:02d}"
         return f"{self.user_id}_session_{window_str}"
 
     @classmethod
@@ -139,6 +173,9 @@ class Event(models.Model):
             queryset = queryset.filter(timestamp__gte=filters["start_date"])
         if "end_date" in filters:
             queryset = queryset.filter(timestamp__lte=filters["end_date"])
+        if "properties" in filters:
+            # Compiles to @>, served by the GIN index on event_properties
+            queryset = queryset.filter(event_properties__contains=filters["properties"])
 
         return queryset.order_by("-timestamp")
 
@@ -146,20 +183,136 @@ class Event(models.Model):
     def get_event_counts_by_name(cls, project, start_date=None, end_date=None):
         """
         Get event counts grouped by event name for analytics
-        """
-        queryset = cls.objects.filter(project=project)
 
+        Whole days already rolled up by the daily aggregation job are summed from
+        DailyEventAggregation; only the remaining time is counted from raw events.
+        """
+        # Complete past days fully inside the range that have a daily rollup; a
+        # rollup of today (run by hand or by a late retry) is already stale
+        rolled_up = ProjectDailySummary.objects.filter(
+            project=project, date__lt=timezone.localdate()
+        )
         if start_date:
-            queryset = queryset.filter(timestamp__gte=start_date)
+            start_local = timezone.localtime(start_date)
+            first_day = start_local.date()
+            if start_local.time() != time.min:
+                first_day += timedelta(days=1)
+            rolled_up = rolled_up.filter(date__gte=first_day)
+        if end_date:
+            rolled_up = rolled_up.filter(date__lt=timezone.localtime(end_date).date())
+        rolled_up_days = list(rolled_up.order_by("date").values_list("date", flat=True))
+
+        counts = Counter(
+            dict(
+                DailyEventAggregation.objects.filter(
+                    project=project, date__in=rolled_up_days
+                )
+                .values("event_name")
+                .annotate(count=models.Sum("event_count"))
+                .values_list("event_name", "count")
+            )
+            if rolled_up_days
+            else {}
+        )
+
+        # Count raw events only in the gaps between rolled-up days
+        gaps = cls._outside_windows(
+            start_date,
+            [
+                timezone.make_aware(datetime.combine(day, time.min))
+                for day in rolled_up_days
+            ],
+            timedelta(days=1),
+        )
+
+        queryset = cls.objects.filter(gaps, project=project)
         if end_date:
             queryset = queryset.filter(timestamp__lte=end_date)
 
-        return (
-            queryset.values("event_name")
-            .annotate(count=models.Count("id"))
-            .order_by("-count")
+        counts.update(
+            dict(
+                queryset.values("event_name")
+                .annotate(count=models.Count("id"))
+                .values_list("event_name", "count")
+            )
         )
 
+        return [
+            {"event_name": event_name, "count": count}
+            for event_name, count in counts.most_common()
+        ]
+
+    @classmethod
+    def get_top_event_names(cls, project, start, limit=10):
+        """
+        Most frequent event names since start, as (event_name, count) pairs
+
+        Completed hours already rolled up by the hourly aggregation job are summed
+        from HourlyEventAggregation; only the remaining time is counted from raw
+        events.
+
+        An hour counts as rolled up once it is at least an hour old and has any
+        aggregation rows. Events stored for that hour after the hourly job ran,
+        e.g. while the stream still had a backlog, are left out until the hour
+        is aggregated again.
+        """
+        first_hour = start.replace(minute=0, second=0, microsecond=0)
+        if first_hour < start:
+            first_hour += timedelta(hours=1)
+
+        counts = Counter()
+        rolled_up_hours = set()
+        for hour, event_name, count in (
+            HourlyEventAggregation.objects.filter(
+                project=project,
+                datetime_hour__gte=first_hour,
+                datetime_hour__lte=timezone.now() - timedelta(hours=1),
+            )
+            .values("datetime_hour", "event_name")
+            .annotate(count=models.Sum("event_count"))
+            .values_list("datetime_hour", "event_name", "count")
+        ):
+            rolled_up_hours.add(hour)
+            counts[event_name] += count
+
+        # Count raw events only in the gaps between rolled-up hours
+        gaps = cls._outside_windows(start, sorted(rolled_up_hours), timedelta(hours=1))
+        counts.update(
+            dict(
+                cls.objects.filter(gaps, project=project)
+                .values("event_name")
+                .annotate(count=models.Count("id"))
+                .values_list("event_name", "count")
+            )
+        )
+
+        return counts.most_common(limit)
+
+    @classmethod
+    def _outside_windows(cls, start, window_starts, length):
+        """
+        Q for timestamps from start onward (unbounded if None) that fall outside
+        the given windows, each length long and sorted by start
+        """
+        gaps = models.Q()
+        gap_start = start
+        for window_start in window_starts:
+            if gap_start is None or gap_start < window_start:
+                gaps |= cls._timestamp_range(gap_start, window_start)
+            gap_start = window_start + length
+        gaps |= cls._timestamp_range(gap_start, None)
+        return gaps
+
+    @staticmethod
+    def _timestamp_range(start, end):
+        """Q for timestamp >= start and < end, either bound optional"""
+        q = models.Q()
+        if start is not None:
+            q &= models.Q(timestamp__gte=start)
+        if end is not None:
+            q &= models.Q(timestamp__lt=end)
+        return q
+
     def mark_processed(self):
         """Mark this event as processed"""
         self.processed_at = timezone.now()
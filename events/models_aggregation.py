@@ -3,6 +3,7 @@ Models for storing aggregated event data
 """
 
 from django.db import models
+from django.utils import timezone
 
 from projects.models import EventSource, Project
 
@@ -33,9 +34,77 @@ class EventAggregation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Metrics replaced when a window is re-aggregated
+    metric_fields = ["event_count", "unique_users", "unique_sessions"]
+
+    # Name of the time window field, set by subclasses
+    window_field = None
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def upsert_window(cls, project, window, rows) -> int:
+        """
+        Write aggregated rows for one project and time window with a single
+        INSERT ... ON CONFLICT DO UPDATE, replacing the metrics of existing rows.
+        Rows are dicts with event_source, event_name and the metric fields.
+        Returns the number of rows written.
+        """
+        window_filter = {cls.window_field: window}
+
+        # NULLs never conflict in a unique constraint, so source-less rows that
+        # already exist are found up front and updated in place
+        sourceless_names = [
+            data["event_name"] for data in rows if data["event_source"] is None
+        ]
+        existing_sourceless = (
+            set(
+                cls.objects.filter(
+                    project=project,
+                    event_source=None,
+                    event_name__in=sourceless_names,
+                    **window_filter,
+                ).values_list("event_name", flat=True)
+            )
+            if sourceless_names
+            else set()
+        )
+
+        objs = []
+        for data in rows:
+            metrics = {field: data[field] for field in cls.metric_fields}
+
+            if (
+                data["event_source"] is None
+                and data["event_name"] in existing_sourceless
+            ):
+                cls.objects.filter(
+                    project=project,
+                    event_source=None,
+                    event_name=data["event_name"],
+                    **window_filter,
+                ).update(**metrics, updated_at=timezone.now())
+                continue
+
+            objs.append(
+                cls(
+                    project=project,
+                    event_source_id=data["event_source"],
+                    event_name=data["event_name"],
+                    **window_filter,
+                    **metrics,
+                )
+            )
+
+        cls.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["project", "event_source", "event_name", cls.window_field],
+            update_fields=[*cls.metric_fields, "updated_at"],
+        )
+        return len(rows)
+
 
 class DailyEventAggregation(EventAggregation):
     """
@@ -44,6 +113,8 @@ class DailyEventAggregation(EventAggregation):
 
     date = models.DateField(db_index=True)
 
+    window_field = "date"
+
     class Meta:
         unique_together = ["project", "event_source", "event_name", "date"]
         indexes = [
@@ -67,6 +138,8 @@ class FiveMinuteEventAggregation(EventAggregation):
         db_index=True
     )  # Truncated to 5-minute intervals
 
+    window_field = "datetime_5min"
+
     class Meta:
         unique_together = ["project", "event_source", "event_name", "datetime_5min"]
         indexes = [
@@ -89,6 +162,8 @@ class HourlyEventAggregation(EventAggregation):
 
     datetime_hour = models.DateTimeField(db_index=True)  # Truncated to hour
 
+    window_field = "datetime_hour"
+
     class Meta:
         unique_together = ["project", "event_source", "event_name", "datetime_hour"]
         indexes = [
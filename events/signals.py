@@ -0,0 +1,65 @@
+"""
+Signal handlers keeping cached project and event source lookups in sync with
+the database
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from projects.models import EventSource, Project
+
+from .authentication import invalidate_project_cache
+from .serializers import invalidate_event_source_cache
+
+
+def _project_api_keys(public_api_key: str, private_api_key: str):
+    return (
+        ("public_api_key", public_api_key),
+        ("private_api_key", private_api_key),
+    )
+
+
+@receiver(pre_save, sender=Project)
+def invalidate_previous_project_keys(sender, instance, **kwargs):
+    """Drop cache entries for the stored keys, which a save may be replacing"""
+    if instance._state.adding:
+        return
+
+    previous = (
+        Project.objects.filter(pk=instance.pk)
+        .values_list("public_api_key", "private_api_key")
+        .first()
+    )
+    if previous:
+        invalidate_project_cache(*_project_api_keys(*previous))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_current_project_keys(sender, instance, **kwargs):
+    """Drop cache entries for the keys the project holds after a save/delete"""
+    invalidate_project_cache(
+        *_project_api_keys(instance.public_api_key, instance.private_api_key)
+    )
+
+
+@receiver(pre_save, sender=EventSource)
+def invalidate_previous_event_source(sender, instance, **kwargs):
+    """Drop the cache entry for the stored name, which a save may be replacing"""
+    if instance._state.adding:
+        return
+
+    previous = (
+        EventSource.objects.filter(pk=instance.pk)
+        .values_list("project_id", "name")
+        .first()
+    )
+    if previous:
+        invalidate_event_source_cache(*previous)
+
+
+@receiver(post_save, sender=EventSource)
+@receiver(post_delete, sender=EventSource)
+def invalidate_current_event_source(sender, instance, **kwargs):
+    """Drop the cache entry for the source's name after a save/delete"""
+    invalidate_event_source_cache(instance.project_id, instance.name)
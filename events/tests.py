@@ -6,7 +6,7 @@ from datetime import datetime
 from unittest.mock import Mock, patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework import status
@@ -14,22 +14,47 @@ from rest_framework.test import APITestCase
 
 from projects.models import EventSource, Project
 
+# Users are created with passwords in every fixture; the default PBKDF2 hasher
+# makes that the slowest part of setup, and nothing here checks passwords
+fast_password_hashing = override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
 
+
+def patch_redis(test_case):
+    """Point the ingestion view and throttle at a mock Redis client"""
+    redis_client = Mock()
+    # The rate limit script allows every request
+    redis_client.register_script.return_value.return_value = [1, 0]
+
+    for target in (
+        "events.views.get_redis_client",
+        "events.throttling.get_redis_client",
+    ):
+        patcher = patch(target, return_value=redis_client)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+
+    return redis_client
+
+
+@fast_password_hashing
 class EventIngestionTestCase(APITestCase):
     """Test cases for the event ingestion API endpoint"""
 
-    def setUp(self):
-        """Set up test data"""
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
         # Create test user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
 
         # Create test project
-        self.project = Project.objects.create(
+        cls.project = Project.objects.create(
             name="Test Project",
             description="Test project for API testing",
-            owner=self.user,
+            owner=cls.user,
             sampling_enabled=False,  # Disable sampling for most tests
             sampling_rate=1.0,
             sampling_strategy="random",
@@ -37,10 +62,14 @@ class EventIngestionTestCase(APITestCase):
         )
 
         # Create test event source
-        self.event_source = EventSource.objects.create(
-            project=self.project, name="test_source", description="Test event source"
+        cls.event_source = EventSource.objects.create(
+            project=cls.project, name="test_source", description="Test event source"
         )
 
+    def setUp(self):
+        """Set up per-test request data"""
+        self.redis_client = patch_redis(self)
+
         # API endpoint
         self.url = reverse("events:ingest")
 
@@ -210,7 +239,7 @@ class EventIngestionTestCase(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
-    @patch("events.views.redis.from_url")
+    @patch("events.views.get_redis_client")
     def test_redis_failure_handling(self, mock_redis):
         """Test handling of Redis failures during event queuing"""
         # Mock Redis to raise an exception
@@ -228,28 +257,33 @@ class EventIngestionTestCase(APITestCase):
         self.assertIn("error", response.data)
 
 
+@fast_password_hashing
 class SamplingTestCase(APITestCase):
     """Test cases for sampling logic"""
 
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        cls.user = User.objects.create_user(
             username="samplinguser",
             email="sampling@example.com",
             password="testpass123",
         )
 
         # Create project with sampling enabled
-        self.project = Project.objects.create(
+        cls.project = Project.objects.create(
             name="Sampling Test Project",
             description="Project for testing sampling",
-            owner=self.user,
+            owner=cls.user,
             sampling_enabled=True,
             sampling_rate=0.5,  # 50% sampling
             sampling_strategy="random",
             rate_limit_per_minute=100,
         )
 
+    def setUp(self):
+        """Set up per-test request data"""
+        self.redis_client = patch_redis(self)
         self.url = reverse("events:ingest")
         self.event_data = {"event_name": "sampling_test", "user_id": "test_user_123"}
 
@@ -323,35 +357,41 @@ class SamplingTestCase(APITestCase):
         self.assertTrue(all(r == results[0] for r in results))
 
 
+@fast_password_hashing
 class RateLimitingTestCase(APITestCase):
     """Test cases for rate limiting functionality"""
 
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        cls.user = User.objects.create_user(
             username="ratelimituser",
             email="ratelimit@example.com",
             password="testpass123",
         )
 
         # Create project with low rate limit for testing
-        self.project = Project.objects.create(
+        cls.project = Project.objects.create(
             name="Rate Limit Test Project",
             description="Project for testing rate limits",
-            owner=self.user,
+            owner=cls.user,
             sampling_enabled=False,
             rate_limit_per_minute=5,  # Very low for testing
         )
 
+    def setUp(self):
+        """Set up per-test request data"""
         self.url = reverse("events:ingest")
         self.event_data = {"event_name": "rate_limit_test"}
 
-    @patch("events.throttling.redis.from_url")
+    @patch("events.throttling.get_redis_client")
     def test_rate_limiting_redis_failure(self, mock_redis):
         """Test that rate limiting fails open when Redis is unavailable"""
         # Mock Redis to raise an exception
         mock_redis_client = Mock()
-        mock_redis_client.pipeline.side_effect = Exception("Redis connection failed")
+        mock_redis_client.register_script.return_value.side_effect = Exception(
+            "Redis connection failed"
+        )
         mock_redis.return_value = mock_redis_client
 
         # Request should still succeed (fail open)
@@ -374,6 +414,7 @@ class RateLimitingTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
 
+@fast_password_hashing
 class EventDataProcessingTestCase(TestCase):
     """Test cases for event data processing and serialization"""
 
@@ -436,6 +477,7 @@ class EventDataProcessingTestCase(TestCase):
         self.assertEqual(view.get_user_agent(request), "")
 
 
+@fast_password_hashing
 class EventSerializerTestCase(TestCase):
     """Test cases for event serialization logic"""
 
@@ -6,11 +6,91 @@ import time
 
 from django.conf import settings
 
-import redis
+from redis.commands.core import Script
 from rest_framework.throttling import BaseThrottle
 
 from projects.models import Project
 
+from .connections import get_redis_client
+from .utils import get_client_ip
+
+# Both scripts take KEYS[i] with its limit in ARGV[3 + i], after the current
+# time, window size and the request's cost, and check every key in one atomic
+# round trip. The request is only counted, cost times, when every limit passes.
+# They return {1, 0} when allowed or {0, retry_after} for the first exceeded
+# limit.
+
+# Fixed window: one counter per key that expires at the end of its window
+FIXED_WINDOW_SCRIPT = """
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+for i, key in ipairs(KEYS) do
+    if tonumber(redis.call('GET', key) or '0') + cost > tonumber(ARGV[3 + i]) then
+        local ttl = redis.call('TTL', key)
+        if ttl > 0 then
+            return {0, ttl}
+        end
+        return {0, window}
+    end
+end
+for _, key in ipairs(KEYS) do
+    if redis.call('INCRBY', key, cost) == cost then
+        redis.call('EXPIRE', key, window)
+    end
+end
+return {1, 0}
+"""
+
+# Sliding window: a sorted set of request timestamps per key
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+    if redis.call('ZCARD', key) + cost > tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        if oldest[2] then
+            return {0, window - (now - tonumber(oldest[2]))}
+        end
+        return {0, window}
+    end
+end
+for _, key in ipairs(KEYS) do
+    -- Members only need to be unique within the current second, where the
+    -- set can only grow
+    local size = redis.call('ZCARD', key)
+    for j = 1, cost do
+        redis.call('ZADD', key, now, now .. ':' .. (size + j))
+    end
+    redis.call('EXPIRE', key, window + 10)
+end
+return {1, 0}
+"""
+
+RATE_LIMIT_SCRIPTS = {
+    "fixed_window": FIXED_WINDOW_SCRIPT,
+    "sliding_window": SLIDING_WINDOW_SCRIPT,
+}
+
+# One registered script per strategy, shared by every throttle in this process
+_rate_limit_scripts: dict[str, Script] = {}
+
+
+def get_rate_limit_script() -> Script:
+    """
+    Return the script for settings.RATE_LIMIT_STRATEGY, registered on the
+    shared Redis client the first time it is needed.
+    """
+    strategy = settings.RATE_LIMIT_STRATEGY
+    script = _rate_limit_scripts.get(strategy)
+    if script is None:
+        script = _rate_limit_scripts.setdefault(
+            strategy,
+            get_redis_client().register_script(RATE_LIMIT_SCRIPTS[strategy]),
+        )
+    return script
+
 
 class EventIngestionThrottle(BaseThrottle):
     """
@@ -19,21 +99,12 @@ class EventIngestionThrottle(BaseThrottle):
     """
 
     def __init__(self):
-        self.redis_client = redis.from_url(settings.REDIS_URL)
         self.window_size = 60  # 1 minute window
 
     def get_client_identifier(self, request, view) -> str:
         """Get client IP address"""
-        # Use the same logic as in the view
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
-
-        return request.META.get("REMOTE_ADDR", "unknown")
+        # Shared with the view, which reuses the value stored on the request
+        return get_client_ip(request)
 
     def get_project_rate_limit(self, project: Project) -> int:
         """Get rate limit for the project"""
@@ -44,41 +115,38 @@ class EventIngestionThrottle(BaseThrottle):
         # Default IP rate limit (can be made configurable)
         return 1000  # requests per minute per IP
 
+    def get_request_cost(self, request, view) -> int:
+        """Get the number of hits to charge, one unless the view says otherwise"""
+        get_throttle_cost = getattr(view, "get_throttle_cost", None)
+        return get_throttle_cost(request) if get_throttle_cost else 1
+
     def check_rate_limit(
-        self, key: str, limit: int, window: int = 60
+        self, key: str, limit: int, window: int = 60, cost: int = 1
     ) -> tuple[bool, int | None]:
         """
-        Check if rate limit is exceeded using sliding window.
+        Check if rate limit is exceeded for a single key.
         Returns (allowed, retry_after_seconds)
         """
+        return self.check_rate_limits({key: limit}, window, cost)
+
+    def check_rate_limits(
+        self, limits: dict[str, int], window: int = 60, cost: int = 1
+    ) -> tuple[bool, int | None]:
+        """
+        Check several limits, keyed by Redis key, in one call, charging each
+        of them cost hits.
+        Returns (allowed, retry_after_seconds) for the first exceeded limit.
+        """
         try:
             current_time = int(time.time())
-            pipe = self.redis_client.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, current_time - window)
-
-            # Count current requests in the window
-            pipe.zcard(key)
-
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
+            allowed, retry_after = get_rate_limit_script()(
+                keys=list(limits),
+                args=[current_time, window, cost, *limits.values()],
+            )
 
-            # Set expiration for cleanup
-            pipe.expire(key, window + 10)
-
-            results = pipe.execute()
-            current_count = results[1]
-
-            if current_count >= limit:
+            if not allowed:
                 # Rate limit exceeded
-                # Calculate retry after time
-                oldest_in_window = self.redis_client.zrange(key, 0, 0, withscores=True)
-                if oldest_in_window:
-                    oldest_time = int(oldest_in_window[0][1])
-                    retry_after = window - (current_time - oldest_time)
-                    return False, max(1, retry_after)
-                return False, window
+                return False, max(1, int(retry_after))
 
             return True, None
 
@@ -100,26 +168,18 @@ class EventIngestionThrottle(BaseThrottle):
 
         client_ip = self.get_client_identifier(request, view)
 
-        # Check project-level rate limit
-        project_key = f"rate_limit:project:{project.id}"
-        project_limit = self.get_project_rate_limit(project)
+        # Project-level and IP-level limits are checked together
+        limits = {
+            f"rate_limit:project:{project.id}": self.get_project_rate_limit(project),
+            f"rate_limit:ip:{client_ip}": self.get_ip_rate_limit(),
+        }
 
-        project_allowed, project_retry = self.check_rate_limit(
-            project_key, project_limit, self.window_size
+        allowed, retry_after = self.check_rate_limits(
+            limits, self.window_size, self.get_request_cost(request, view)
         )
 
-        if not project_allowed:
-            self.wait = project_retry
-            return False
-
-        # Check IP-level rate limit
-        ip_key = f"rate_limit:ip:{client_ip}"
-        ip_limit = self.get_ip_rate_limit()
-
-        ip_allowed, ip_retry = self.check_rate_limit(ip_key, ip_limit, self.window_size)
-
-        if not ip_allowed:
-            self.wait = ip_retry
+        if not allowed:
+            self._wait_seconds = retry_after
             return False
 
         return True
@@ -128,4 +188,4 @@ class EventIngestionThrottle(BaseThrottle):
         """
         Return the recommended retry-after time in seconds.
         """
-        return getattr(self, "wait", None)
+        return getattr(self, "_wait_seconds", None)
@@ -7,6 +7,7 @@ app_name = "events"
 # Event Ingestion API
 ingestion_patterns = [
     path("ingest/", views.EventIngestionView.as_view(), name="ingest"),
+    path("ingest/bulk/", views.EventBulkIngestionView.as_view(), name="ingest_bulk"),
 ]
 
 # Dashboard API - Event Querying
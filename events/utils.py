@@ -0,0 +1,29 @@
+"""
+Request helpers shared by the ingestion views and throttling
+"""
+
+from django.http import HttpRequest
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    """
+    Extract the client IP address from a request, preferring proxy headers.
+    The result is stored on the request so the throttle and the view only
+    resolve it once per request.
+    """
+    client_ip = getattr(request, "_client_ip", None)
+    if client_ip is not None:
+        return client_ip
+
+    meta = request.META
+
+    # Check for forwarded IP first (load balancer/proxy)
+    forwarded_for = meta.get("HTTP_X_FORWARDED_FOR")
+    if forwarded_for:
+        client_ip = forwarded_for.partition(",")[0].strip()
+    else:
+        # Then the real IP header, falling back to the socket address
+        client_ip = meta.get("HTTP_X_REAL_IP") or meta.get("REMOTE_ADDR", "unknown")
+
+    request._client_ip = client_ip
+    return client_ip
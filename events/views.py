@@ -8,9 +8,9 @@ from typing import Any
 
 from django.conf import settings
 from django.http import HttpRequest
+from django.utils import timezone
 
-import redis
-from rest_framework import status
+from rest_framework import exceptions, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -18,11 +18,21 @@ from rest_framework.views import APIView
 from projects.models import Project
 
 from .authentication import ApiKeyAuthentication
-from .serializers import EventIngestionSerializer
+from .connections import get_redis_client
+from .serializers import MAX_PROPERTIES_SIZE, EventIngestionSerializer
 from .throttling import EventIngestionThrottle
+from .utils import get_client_ip
 
 logger = logging.getLogger(__name__)
 
+EVENT_STREAM_KEY = "events:queue"
+
+
+class RequestTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body too large."
+    default_code = "request_too_large"
+
 
 class EventIngestionView(APIView):
     """
@@ -37,28 +47,42 @@ class EventIngestionView(APIView):
     permission_classes = [AllowAny]  # Authentication handled by API key
     throttle_classes = [EventIngestionThrottle]
 
+    # Bodies above this are rejected before parsing; room for the largest
+    # accepted properties plus the other fields. None defers to Django's
+    # DATA_UPLOAD_MAX_MEMORY_SIZE.
+    max_body_size = 2 * MAX_PROPERTIES_SIZE
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.redis_client = redis.from_url(settings.REDIS_URL)
+        self.redis_client = get_redis_client()
 
-    def get_client_ip(self, request: HttpRequest) -> str:
-        """Extract client IP address from request"""
-        # Check for forwarded IP first (load balancer/proxy)
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
+    def initial(self, request, *args, **kwargs):
+        """
+        Reject oversized bodies from Content-Length before authentication,
+        throttling or JSON parsing do any work on them.
+        """
+        if self.max_body_size is not None:
+            try:
+                content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                content_length = 0
+            if content_length > self.max_body_size:
+                raise RequestTooLarge()
 
-        # Check for real IP header
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
+        super().initial(request, *args, **kwargs)
 
-        # Fall back to remote addr
-        return request.META.get("REMOTE_ADDR", "unknown")
+    def get_throttle_cost(self, request) -> int:
+        """Number of rate limit hits this request is charged"""
+        return 1
+
+    def get_client_ip(self, request: HttpRequest) -> str:
+        """Extract client IP address from request"""
+        return get_client_ip(request)
 
     def get_user_agent(self, request: HttpRequest) -> str:
         """Extract user agent from request"""
-        return request.headers.get("user-agent", "")
+        # META directly; request.headers rebuilds a dict from every META key
+        return request.META.get("HTTP_USER_AGENT", "")
 
     def apply_sampling_decision(
         self, project: Project, event_data: dict[str, Any]
@@ -83,42 +107,47 @@ class EventIngestionView(APIView):
 
         return should_process
 
+    def build_stream_payload(self, event_data: dict[str, Any]) -> dict[str, str]:
+        """Build the Redis stream entry for a prepared event"""
+        # Prepare serializable event data for Redis
+        serializable_data = {
+            "project_id": str(event_data["project"].id),
+            "event_source_id": (
+                str(event_data["event_source"].id)
+                if event_data["event_source"]
+                else None
+            ),
+            "event_name": event_data["event_name"],
+            "event_properties": event_data["event_properties"],
+            "user_id": event_data["user_id"],
+            "session_id": event_data["session_id"],
+            "ip_address": event_data["ip_address"],
+            "user_agent": event_data["user_agent"],
+            "timestamp": event_data["timestamp"].isoformat(),
+        }
+
+        # Add optional event_id if present
+        if "event_id" in event_data:
+            serializable_data["event_id"] = event_data["event_id"]
+
+        # Create Redis stream payload; the worker only reads event_data
+        return {"event_data": json.dumps(serializable_data)}
+
     def queue_event_for_processing(self, event_data: dict[str, Any]) -> bool:
         """
         Queue event in Redis for background processing.
         Returns True if successful, False otherwise.
         """
         try:
-            # Prepare serializable event data for Redis
-            serializable_data = {
-                "project_id": str(event_data["project"].id),
-                "event_source_id": (
-                    str(event_data["event_source"].id)
-                    if event_data["event_source"]
-                    else None
-                ),
-                "event_name": event_data["event_name"],
-                "event_properties": event_data["event_properties"],
-                "user_id": event_data["user_id"],
-                "session_id": event_data["session_id"],
-                "ip_address": event_data["ip_address"],
-                "user_agent": event_data["user_agent"],
-                "timestamp": event_data["timestamp"].isoformat(),
-            }
-
-            # Add optional event_id if present
-            if "event_id" in event_data:
-                serializable_data["event_id"] = event_data["event_id"]
-
-            # Create Redis stream payload
-            event_payload = {
-                "event_data": json.dumps(serializable_data),
-                "queued_at": serializable_data["timestamp"],
-            }
+            event_payload = self.build_stream_payload(event_data)
 
             # Use Redis stream for reliable queuing
-            stream_key = "events:queue"
-            self.redis_client.xadd(stream_key, event_payload)
+            self.redis_client.xadd(
+                EVENT_STREAM_KEY,
+                event_payload,
+                maxlen=settings.EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
 
             logger.debug(f"Queued event for processing: {event_data['event_name']}")
             return True
@@ -144,7 +173,9 @@ class EventIngestionView(APIView):
         user_agent = self.get_user_agent(request)
 
         # Validate request data
-        serializer = EventIngestionSerializer(data=request.data)
+        serializer = EventIngestionSerializer(
+            data=request.data, context={"now": timezone.now()}
+        )
         if not serializer.is_valid():
             logger.warning(
                 f"Invalid event data from project {project.name}: {serializer.errors}"
@@ -188,3 +219,123 @@ class EventIngestionView(APIView):
                 {"error": "Failed to process event"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class EventBulkIngestionView(EventIngestionView):
+    """
+    Batch event ingestion endpoint.
+
+    POST /api/events/ingest/bulk/
+
+    Accepts {"events": [...]} with up to max_events events using the same schema
+    as the single-event endpoint. The batch is validated as a whole and queued
+    with one Redis round trip.
+    """
+
+    max_events = 100
+    # Room for a full batch of the largest single events
+    max_body_size = max_events * EventIngestionView.max_body_size
+
+    def get_throttle_cost(self, request) -> int:
+        """Charge one hit per event so batching cannot bypass the rate limits"""
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        if isinstance(events, list) and events:
+            # Oversized batches are rejected with a 400 after throttling, so
+            # they must not burn more than a full batch of the quota
+            return min(len(events), self.max_events)
+        return 1
+
+    def queue_events_for_processing(self, events: list[dict[str, Any]]) -> bool:
+        """
+        Queue a batch of events in Redis using a single pipeline.
+        Returns True if successful, False otherwise.
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for event_data in events:
+                pipe.xadd(
+                    EVENT_STREAM_KEY,
+                    self.build_stream_payload(event_data),
+                    maxlen=settings.EVENT_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            pipe.execute()
+
+            logger.debug(f"Queued {len(events)} events for processing")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to queue event batch: {str(e)}")
+            return False
+
+    def post(self, request):
+        """
+        Handle bulk event ingestion POST request.
+        """
+        project = request.user
+        if not isinstance(project, Project):
+            return Response(
+                {"error": "Authentication required"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        if not isinstance(events, list) or not events:
+            return Response(
+                {"error": "Request body must contain a non-empty 'events' list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(events) > self.max_events:
+            return Response(
+                {"error": f"Too many events in batch (max {self.max_events})"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate the whole batch up front so it is accepted or rejected together
+        serializer = EventIngestionSerializer(
+            data=events, many=True, context={"now": timezone.now()}
+        )
+        if not serializer.is_valid():
+            logger.warning(
+                f"Invalid event batch from project {project.name}: {serializer.errors}"
+            )
+            return Response(
+                {"error": "Invalid event data", "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        client_ip = self.get_client_ip(request)
+        user_agent = self.get_user_agent(request)
+
+        queued_events = []
+        for validated_data in serializer.validated_data:
+            event_data = serializer.child.create_event_data(validated_data, project)
+            event_data["ip_address"] = client_ip
+            event_data["user_agent"] = user_agent
+
+            if self.apply_sampling_decision(project, event_data):
+                queued_events.append(event_data)
+
+        if queued_events and not self.queue_events_for_processing(queued_events):
+            logger.error(
+                f"Failed to queue batch of {len(queued_events)} events "
+                f"from project {project.name}"
+            )
+            return Response(
+                {"error": "Failed to process events"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(
+            f"Batch ingested successfully: {len(queued_events)} events "
+            f"from project {project.name}"
+        )
+        return Response(
+            {
+                "status": "accepted",
+                "accepted": len(queued_events),
+                "sampled": len(events) - len(queued_events),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
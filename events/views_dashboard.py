@@ -2,9 +2,13 @@
 Dashboard API Views for analytics data querying
 """
 
+import json
+import logging
 from datetime import timedelta
 
-from django.db.models import Count
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from rest_framework import generics
@@ -13,9 +17,13 @@ from rest_framework.decorators import (
     authentication_classes,
     permission_classes,
 )
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
 
 from projects.models import Project
 
@@ -25,7 +33,6 @@ from .models_aggregation import (
     DailyEventAggregation,
     FiveMinuteEventAggregation,
     HourlyEventAggregation,
-    ProjectDailySummary,
 )
 from .serializers import (
     DailyAggregationSerializer,
@@ -37,6 +44,60 @@ from .serializers import (
     TimeRangeFilterSerializer,
 )
 
+logger = logging.getLogger(__name__)
+
+# Dashboards poll these endpoints; short TTLs let concurrent pollers of the
+# same project share one computation while staying close to live
+REALTIME_METRICS_CACHE_TIMEOUT = 5
+EVENT_NAMES_CACHE_TIMEOUT = 60
+
+# Rows fetched per server-side cursor round trip when streaming an export
+EVENT_EXPORT_CHUNK_SIZE = 2000
+
+
+def _cache_get(cache_key: str):
+    try:
+        return cache.get(cache_key)
+    except Exception as e:
+        # If the cache is unavailable, compute the response (fail open)
+        logger.error(f"Dashboard cache read error: {e}")
+        return None
+
+
+def _cache_set(cache_key: str, value, timeout: int) -> None:
+    try:
+        cache.set(cache_key, value, timeout=timeout)
+    except Exception as e:
+        logger.error(f"Dashboard cache write error: {e}")
+
+
+def aggregation_columns(model) -> tuple[str, ...]:
+    """Columns the aggregation serializers read, joined source name included"""
+    return (
+        # Only the key; the project itself comes from the related manager
+        "project",
+        "event_source__name",
+        "event_name",
+        model.window_field,
+        *model.metric_fields,
+        "created_at",
+        "updated_at",
+    )
+
+
+def get_time_range_filters(request, raise_exception: bool = False) -> dict:
+    """
+    Validated TimeRangeFilterSerializer data for the request's query params.
+    Invalid filters raise ValidationError when raise_exception is set and are
+    ignored otherwise.
+    """
+    filter_serializer = TimeRangeFilterSerializer(data=request.query_params)
+    if not filter_serializer.is_valid():
+        if raise_exception:
+            raise ValidationError(filter_serializer.errors)
+        return {}
+    return filter_serializer.validated_data
+
 
 class IsProjectAuthenticated(BasePermission):
     """
@@ -56,6 +117,38 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 1000
 
 
+class EventCursorPagination(CursorPagination):
+    """Keyset pagination for raw events, so deep pages don't scan past an OFFSET"""
+
+    ordering = ("-timestamp", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON, one object per line, for streamed exports"""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render_line(self, item) -> bytes:
+        return (
+            json.dumps(
+                item,
+                cls=encoders.JSONEncoder,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Exports stream lines themselves; this only renders error responses
+        return self.render_line(data)
+
+
 class EventQueryView(generics.ListAPIView):
     """
     Query raw events with filtering, pagination, and project isolation
@@ -68,14 +161,17 @@ class EventQueryView(generics.ListAPIView):
     - event_name: Filter by event name
     - event_source_id: Filter by event source
     - user_id: Filter by user
-    - page: Page number
+    - properties: JSON object the event properties must contain
+    - cursor: Opaque cursor from the previous response's next/previous link
     - page_size: Results per page (max 1000)
+    - format: "ndjson" streams every matching event, one per line, unpaginated
     """
 
     serializer_class = EventSerializer
     authentication_classes = [PrivateApiKeyAuthentication]
     permission_classes = [IsProjectAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = EventCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def get_queryset(self):
         # Get project from API key authentication
@@ -84,36 +180,77 @@ class EventQueryView(generics.ListAPIView):
         # Start with project-isolated queryset
         queryset = (
             Event.objects.filter(project=project)
-            .select_related("project", "event_source")
-            .order_by("-timestamp")
+            # Plain rows with just the columns EventSerializer outputs; see list()
+            .values(
+                "id",
+                "event_id",
+                "event_name",
+                "event_properties",
+                "user_id",
+                "session_id",
+                "ip_address",
+                "user_agent",
+                "timestamp",
+                "created_at",
+                event_source_name=F("event_source__name"),
+            )
+            .order_by("-timestamp", "-id")
         )
 
         # Apply filters from query parameters
-        filter_serializer = TimeRangeFilterSerializer(data=self.request.query_params)
-        if filter_serializer.is_valid():
-            filters = filter_serializer.validated_data
-
-            # Time range filtering
-            if filters.get("start_date"):
-                queryset = queryset.filter(timestamp__gte=filters["start_date"])
-            if filters.get("end_date"):
-                queryset = queryset.filter(timestamp__lte=filters["end_date"])
-
-            # Additional filters
-            if filters.get("event_name"):
-                queryset = queryset.filter(event_name=filters["event_name"])
-            if filters.get("event_source_id"):
-                queryset = queryset.filter(event_source_id=filters["event_source_id"])
-            if filters.get("user_id"):
-                queryset = queryset.filter(user_id=filters["user_id"])
-        else:
-            # Raise validation error if filter parameters are invalid
-            from rest_framework.exceptions import ValidationError
-
-            raise ValidationError(filter_serializer.errors)
+        filters = get_time_range_filters(self.request, raise_exception=True)
+
+        # Time range filtering
+        if filters.get("start_date"):
+            queryset = queryset.filter(timestamp__gte=filters["start_date"])
+        if filters.get("end_date"):
+            queryset = queryset.filter(timestamp__lte=filters["end_date"])
+
+        # Additional filters
+        if filters.get("event_name"):
+            queryset = queryset.filter(event_name=filters["event_name"])
+        if filters.get("event_source_id"):
+            queryset = queryset.filter(event_source_id=filters["event_source_id"])
+        if filters.get("user_id"):
+            queryset = queryset.filter(user_id=filters["user_id"])
+        if filters.get("properties"):
+            # Compiles to @>, served by the GIN index on event_properties
+            queryset = queryset.filter(event_properties__contains=filters["properties"])
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            # Stream the export through a server-side cursor instead of
+            # building the whole result in memory
+            rows = queryset.iterator(chunk_size=EVENT_EXPORT_CHUNK_SIZE)
+            return StreamingHttpResponse(
+                map(request.accepted_renderer.render_line, self.render_rows(rows)),
+                content_type=NDJSONRenderer.media_type,
+            )
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(list(self.render_rows(page)))
+
+    def render_rows(self, rows):
+        """
+        Shape .values() rows like EventSerializer output. The renderers format
+        UUIDs and datetimes the way its fields would; skipping per-field
+        to_representation keeps large pages cheap.
+        """
+        fields = self.get_serializer_class().Meta.fields
+        # Every row belongs to the authenticated project; no need to join it
+        project_name = self.request.user.name
+        for row in rows:
+            row["project_name"] = project_name
+            event = {field: row[field] for field in fields}
+            # EventSerializer skips event_source.name for events without a source
+            if event["event_source_name"] is None:
+                del event["event_source_name"]
+            yield event
+
 
 class DailyAggregationView(generics.ListAPIView):
     """
@@ -131,22 +268,22 @@ class DailyAggregationView(generics.ListAPIView):
         project = self.request.user
 
         queryset = (
-            DailyEventAggregation.objects.filter(project=project)
-            .select_related("project", "event_source")
+            # The related manager hands every row the authenticated project,
+            # so project_name needs no join
+            project.dailyeventaggregation_aggregations.select_related("event_source")
+            .only(*aggregation_columns(DailyEventAggregation))
             .order_by("-date", "-event_count")
         )
 
         # Apply time filters
-        filter_serializer = TimeRangeFilterSerializer(data=self.request.query_params)
-        if filter_serializer.is_valid():
-            filters = filter_serializer.validated_data
+        filters = get_time_range_filters(self.request)
 
-            if filters.get("start_date"):
-                queryset = queryset.filter(date__gte=filters["start_date"].date())
-            if filters.get("end_date"):
-                queryset = queryset.filter(date__lte=filters["end_date"].date())
-            if filters.get("event_name"):
-                queryset = queryset.filter(event_name=filters["event_name"])
+        if filters.get("start_date"):
+            queryset = queryset.filter(date__gte=filters["start_date"].date())
+        if filters.get("end_date"):
+            queryset = queryset.filter(date__lte=filters["end_date"].date())
+        if filters.get("event_name"):
+            queryset = queryset.filter(event_name=filters["event_name"])
 
         return queryset
 
@@ -167,22 +304,22 @@ class HourlyAggregationView(generics.ListAPIView):
         project = self.request.user
 
         queryset = (
-            HourlyEventAggregation.objects.filter(project=project)
-            .select_related("project", "event_source")
+            # The related manager hands every row the authenticated project,
+            # so project_name needs no join
+            project.hourlyeventaggregation_aggregations.select_related("event_source")
+            .only(*aggregation_columns(HourlyEventAggregation))
             .order_by("-datetime_hour", "-event_count")
         )
 
         # Apply time filters
-        filter_serializer = TimeRangeFilterSerializer(data=self.request.query_params)
-        if filter_serializer.is_valid():
-            filters = filter_serializer.validated_data
+        filters = get_time_range_filters(self.request)
 
-            if filters.get("start_date"):
-                queryset = queryset.filter(datetime_hour__gte=filters["start_date"])
-            if filters.get("end_date"):
-                queryset = queryset.filter(datetime_hour__lte=filters["end_date"])
-            if filters.get("event_name"):
-                queryset = queryset.filter(event_name=filters["event_name"])
+        if filters.get("start_date"):
+            queryset = queryset.filter(datetime_hour__gte=filters["start_date"])
+        if filters.get("end_date"):
+            queryset = queryset.filter(datetime_hour__lte=filters["end_date"])
+        if filters.get("event_name"):
+            queryset = queryset.filter(event_name=filters["event_name"])
 
         return queryset
 
@@ -206,24 +343,25 @@ class FiveMinuteAggregationView(generics.ListAPIView):
         default_start = timezone.now() - timedelta(hours=24)
 
         queryset = (
-            FiveMinuteEventAggregation.objects.filter(
-                project=project, datetime_5min__gte=default_start
+            # The related manager hands every row the authenticated project,
+            # so project_name needs no join
+            project.fiveminuteeventaggregation_aggregations.filter(
+                datetime_5min__gte=default_start
             )
-            .select_related("project", "event_source")
+            .select_related("event_source")
+            .only(*aggregation_columns(FiveMinuteEventAggregation))
             .order_by("-datetime_5min", "-event_count")
         )
 
         # Apply time filters
-        filter_serializer = TimeRangeFilterSerializer(data=self.request.query_params)
-        if filter_serializer.is_valid():
-            filters = filter_serializer.validated_data
+        filters = get_time_range_filters(self.request)
 
-            if filters.get("start_date"):
-                queryset = queryset.filter(datetime_5min__gte=filters["start_date"])
-            if filters.get("end_date"):
-                queryset = queryset.filter(datetime_5min__lte=filters["end_date"])
-            if filters.get("event_name"):
-                queryset = queryset.filter(event_name=filters["event_name"])
+        if filters.get("start_date"):
+            queryset = queryset.filter(datetime_5min__gte=filters["start_date"])
+        if filters.get("end_date"):
+            queryset = queryset.filter(datetime_5min__lte=filters["end_date"])
+        if filters.get("event_name"):
+            queryset = queryset.filter(event_name=filters["event_name"])
 
         return queryset
 
@@ -243,17 +381,30 @@ class ProjectSummaryView(generics.ListAPIView):
     def get_queryset(self):
         project = self.request.user
 
-        queryset = ProjectDailySummary.objects.filter(project=project).order_by("-date")
+        queryset = (
+            # The related manager hands every row the authenticated project,
+            # so project_name needs neither a join nor a query per summary
+            project.daily_summaries.only(
+                "project",
+                "date",
+                "total_events",
+                "unique_users",
+                "unique_sessions",
+                "unique_event_names",
+                "source_breakdown",
+                "top_events",
+                "created_at",
+                "updated_at",
+            ).order_by("-date")
+        )
 
         # Apply time filters
-        filter_serializer = TimeRangeFilterSerializer(data=self.request.query_params)
-        if filter_serializer.is_valid():
-            filters = filter_serializer.validated_data
+        filters = get_time_range_filters(self.request)
 
-            if filters.get("start_date"):
-                queryset = queryset.filter(date__gte=filters["start_date"].date())
-            if filters.get("end_date"):
-                queryset = queryset.filter(date__lte=filters["end_date"].date())
+        if filters.get("start_date"):
+            queryset = queryset.filter(date__gte=filters["start_date"].date())
+        if filters.get("end_date"):
+            queryset = queryset.filter(date__lte=filters["end_date"].date())
 
         return queryset
 
@@ -277,6 +428,12 @@ def real_time_metrics(request):
     - Event sources list
     """
     project = request.user
+
+    cache_key = f"rtm:{project.id}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return Response(cached)
+
     now = timezone.now()
 
     # Current time windows
@@ -284,38 +441,24 @@ def real_time_metrics(request):
     today = now.replace(hour=0, minute=0, second=0, microsecond=0)
     last_24h = now - timedelta(hours=24)
 
-    # Get project events for different time windows
-    current_hour_events = Event.objects.filter(
-        project=project, timestamp__gte=current_hour
-    ).count()
-
-    today_events = Event.objects.filter(project=project, timestamp__gte=today).count()
-
-    last_24h_events = Event.objects.filter(
-        project=project, timestamp__gte=last_24h
-    ).count()
-
-    # Active users and sessions today
-    today_events_qs = Event.objects.filter(project=project, timestamp__gte=today)
-
-    active_users_today = today_events_qs.values("user_id").distinct().count()
-
     # Current active sessions (last 60 minutes)
     session_window = now - timedelta(minutes=60)
-    active_sessions_now = (
-        Event.objects.filter(project=project, timestamp__gte=session_window)
-        .values("session_id")
-        .distinct()
-        .count()
+
+    # Every counter in one scan of the widest window (the last 24 hours)
+    counts = Event.objects.filter(project=project, timestamp__gte=last_24h).aggregate(
+        current_hour_events=Count("id", filter=Q(timestamp__gte=current_hour)),
+        today_events=Count("id", filter=Q(timestamp__gte=today)),
+        last_24h_events=Count("id"),
+        active_users_today=Count(
+            "user_id", distinct=True, filter=Q(timestamp__gte=today)
+        ),
+        active_sessions_now=Count(
+            "session_id", distinct=True, filter=Q(timestamp__gte=session_window)
+        ),
     )
 
     # Top events today
-    top_events_today = list(
-        today_events_qs.values("event_name")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:10]
-        .values_list("event_name", "count")
-    )
+    top_events_today = Event.get_top_event_names(project, today, limit=10)
 
     # Event sources
     event_sources = list(
@@ -324,11 +467,11 @@ def real_time_metrics(request):
 
     metrics_data = {
         "project_name": project.name,
-        "current_hour_events": current_hour_events,
-        "current_day_events": today_events,
-        "last_24h_events": last_24h_events,
-        "active_users_today": active_users_today,
-        "active_sessions_now": active_sessions_now,
+        "current_hour_events": counts["current_hour_events"],
+        "current_day_events": counts["today_events"],
+        "last_24h_events": counts["last_24h_events"],
+        "active_users_today": counts["active_users_today"],
+        "active_sessions_now": counts["active_sessions_now"],
         "top_events_today": top_events_today,
         "event_sources": event_sources,
         "last_updated": now,
@@ -337,6 +480,8 @@ def real_time_metrics(request):
     serializer = RealTimeMetricsSerializer(data=metrics_data)
     serializer.is_valid(raise_exception=True)
 
+    _cache_set(cache_key, serializer.validated_data, REALTIME_METRICS_CACHE_TIMEOUT)
+
     return Response(serializer.validated_data)
 
 
@@ -351,15 +496,19 @@ def event_names_list(request):
     """
     project = request.user
 
-    # Get unique event names from recent events (last 30 days)
-    recent_cutoff = timezone.now() - timedelta(days=30)
+    cache_key = f"event_names:{project.id}"
+    event_names = _cache_get(cache_key)
 
-    event_names = list(
-        Event.objects.filter(project=project, timestamp__gte=recent_cutoff)
-        .values_list("event_name", flat=True)
-        .distinct()
-        .order_by("event_name")
-    )
+    if event_names is None:
+        # Get unique event names from recent events (last 30 days); rolled-up
+        # days are read from the daily aggregation instead of raw events
+        recent_cutoff = timezone.now() - timedelta(days=30)
+
+        event_names = sorted(
+            row["event_name"]
+            for row in Event.get_event_counts_by_name(project, start_date=recent_cutoff)
+        )
+        _cache_set(cache_key, event_names, EVENT_NAMES_CACHE_TIMEOUT)
 
     return Response({"event_names": event_names, "count": len(event_names)})
 
@@ -2,9 +2,10 @@
 Background workers for processing events from Redis streams
 """
 
+import hashlib
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from django.conf import settings
@@ -15,7 +16,7 @@ import redis
 
 from projects.models import EventSource, Project
 
-from .models import Event
+from .models import Event, hash_user_id
 
 logger = logging.getLogger(__name__)
 
@@ -61,25 +62,22 @@ class EventProcessor:
                 block=timeout,
             )
 
-            processed_count = 0
-
+            parsed = []
             for _, stream_messages in messages:
                 for message_id, fields in stream_messages:
-                    try:
-                        success = self.process_single_event(message_id, fields)
-                        if success:
-                            # Acknowledge successful processing
-                            self.redis_client.xack(
-                                self.stream_key, self.consumer_group, message_id
-                            )
-                            processed_count += 1
-                        else:
-                            logger.warning(f"Failed to process event {message_id}")
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing event {message_id}: {e}", exc_info=True
-                        )
+                    event_data = self.parse_event_data(message_id, fields)
+                    if event_data is None:
+                        logger.warning(f"Failed to process event {message_id}")
+                    else:
+                        parsed.append((message_id, event_data))
+
+            stored_ids = self.create_event_records(parsed)
+            if stored_ids:
+                # Acknowledge all successfully stored events in one call
+                self.redis_client.xack(
+                    self.stream_key, self.consumer_group, *stored_ids
+                )
+            processed_count = len(stored_ids)
 
             if processed_count > 0:
                 logger.info(f"Processed {processed_count} events successfully")
@@ -94,34 +92,203 @@ class EventProcessor:
             logger.error(f"Error reading from stream: {e}", exc_info=True)
             return 0
 
-    def process_single_event(self, message_id: str, fields: dict[str, Any]) -> bool:
+    def parse_event_data(
+        self, message_id: str, fields: dict[str, Any]
+    ) -> dict[str, Any] | None:
         """
-        Process a single event and store it in PostgreSQL
-        Returns True if successful, False otherwise
+        Parse the event data carried by a stream message
+        Returns None if the message is malformed
         """
         try:
-            # Parse event data from Redis fields (handle bytes keys from Redis)
-            event_data_json = fields.get("event_data") or fields.get(b"event_data")
+            # Parse event data from Redis fields (bytes keys unless the client
+            # decodes responses); json.loads accepts the raw bytes as well
+            event_data_json = fields.get(b"event_data") or fields.get("event_data")
             if not event_data_json:
                 logger.error(f"No event_data in message {message_id}")
-                return False
-
-            # Convert bytes to string if necessary
-            if isinstance(event_data_json, bytes):
-                event_data_json = event_data_json.decode("utf-8")
-
-            event_data = json.loads(event_data_json)
+                return None
 
-            # Create the event record
-            return self.create_event_record(event_data)
+            return json.loads(event_data_json)
 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in event data: {e}")
-            return False
+            return None
         except Exception as e:
             logger.error(f"Error processing single event: {e}", exc_info=True)
+            return None
+
+    def process_single_event(self, message_id: str, fields: dict[str, Any]) -> bool:
+        """
+        Process a single event and store it in PostgreSQL
+        Returns True if successful, False otherwise
+        """
+        event_data = self.parse_event_data(message_id, fields)
+        if event_data is None:
             return False
 
+        # Create the event record
+        return self.create_event_record(event_data)
+
+    def create_event_records(self, parsed: list[tuple[str, dict[str, Any]]]) -> list:
+        """
+        Store a batch of parsed events with bulk inserts
+        Returns the message IDs of the events that were stored
+        """
+        if not parsed:
+            return []
+
+        try:
+            # Resolve projects and event sources for the whole batch up front
+            project_ids = {event_data.get("project_id") for _, event_data in parsed}
+            source_ids = {
+                event_data["event_source_id"]
+                for _, event_data in parsed
+                if event_data.get("event_source_id")
+            }
+            # Only keys are needed: the rows just confirm the project is active
+            # and that each source belongs to the event's project
+            projects = {
+                str(project.id): project
+                for project in Project.objects.filter(
+                    id__in=project_ids, is_active=True
+                ).only("id")
+            }
+            event_sources = {
+                str(event_source.id): event_source
+                for event_source in (
+                    EventSource.objects.filter(id__in=source_ids).only("id", "project")
+                    if source_ids
+                    else ()
+                )
+            }
+        except Exception as e:
+            logger.error(f"Error resolving batch, storing events one by one: {e}")
+            return self.create_events_individually(parsed)
+
+        stored_ids = []
+        events = []
+        used_source_ids = set()
+
+        for message_id, event_data in parsed:
+            try:
+                project = projects.get(event_data["project_id"])
+                if project is None:
+                    logger.error(
+                        f"Project {event_data['project_id']} not found or inactive"
+                    )
+                    continue
+
+                event = self.build_event(event_data, project, event_sources)
+            except Exception as e:
+                logger.error(f"Error creating event record: {e}", exc_info=True)
+                continue
+
+            if event.event_source_id:
+                used_source_ids.add(event.event_source_id)
+            events.append(event)
+            stored_ids.append(message_id)
+
+        if not events:
+            return []
+
+        try:
+            with transaction.atomic():
+                Event.objects.bulk_create(
+                    events, batch_size=settings.EVENT_BULK_BATCH_SIZE
+                )
+                self.touch_event_sources(used_source_ids)
+        except Exception as e:
+            # A single bad row fails the whole insert, so retry one by one
+            logger.error(f"Bulk insert failed, storing events one by one: {e}")
+            return self.create_events_individually(parsed)
+
+        logger.debug(f"Created {len(events)} events")
+        return stored_ids
+
+    def create_events_individually(
+        self, parsed: list[tuple[str, dict[str, Any]]]
+    ) -> list:
+        """Store events one at a time, returning the message IDs that were stored"""
+        stored = [
+            (message_id, event_data)
+            for message_id, event_data in parsed
+            if self.create_event_record(event_data)
+        ]
+        try:
+            self.touch_event_sources(
+                {
+                    event_data["event_source_id"]
+                    for _, event_data in stored
+                    if event_data.get("event_source_id")
+                }
+            )
+        except Exception as e:
+            # The events are stored, so still acknowledge them
+            logger.error(f"Error updating event source activity: {e}")
+        return [message_id for message_id, _ in stored]
+
+    def touch_event_sources(self, source_ids) -> None:
+        """Record activity for event sources with one UPDATE for the whole batch"""
+        if source_ids:
+            EventSource.objects.filter(id__in=source_ids).update(
+                last_event_at=timezone.now()
+            )
+
+    def build_event(
+        self,
+        event_data: dict[str, Any],
+        project: Project,
+        event_sources: dict[str, EventSource],
+    ) -> Event:
+        """Build an unsaved Event from processed event data"""
+        # Get event source (if specified)
+        event_source = None
+        if event_data.get("event_source_id"):
+            event_source = event_sources.get(event_data["event_source_id"])
+            if event_source is None or event_source.project_id != project.id:
+                logger.warning(
+                    f"Event source {event_data['event_source_id']} not found"
+                )
+                event_source = None
+
+        # Parse timestamp
+        timestamp = timezone.now()
+        if event_data.get("timestamp"):
+            try:
+                timestamp = datetime.fromisoformat(
+                    event_data["timestamp"].replace("Z", "+00:00")
+                )
+                if timezone.is_naive(timestamp):
+                    timestamp = timezone.make_aware(timestamp)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Invalid timestamp format: {e}, using current time")
+
+        # Generate user_id if not provided
+        user_id = event_data.get("user_id")
+        if not user_id:
+            user_id = self.generate_fallback_user_id(
+                event_data.get("ip_address", ""),
+                event_data.get("user_agent", ""),
+                project,
+            )
+
+        # Generate session_id if not provided
+        session_id = event_data.get("session_id")
+        if not session_id and user_id:
+            session_id = self.generate_session_id(user_id, timestamp)
+
+        return Event(
+            project=project,
+            event_source=event_source,
+            event_name=event_data["event_name"],
+            event_properties=event_data.get("event_properties", {}),
+            user_id=user_id,
+            session_id=session_id,
+            ip_address=event_data.get("ip_address", ""),
+            user_agent=event_data.get("user_agent", ""),
+            timestamp=timestamp,
+            event_id=event_data.get("event_id"),  # Optional client-provided ID
+        )
+
     @transaction.atomic
     def create_event_record(self, event_data: dict[str, Any]) -> bool:
         """
@@ -129,63 +296,28 @@ class EventProcessor:
         """
         try:
             # Get project
-            project = Project.objects.select_related("owner").get(
+            project = Project.objects.only("id").get(
                 id=event_data["project_id"], is_active=True
             )
 
             # Get event source (if specified)
-            event_source = None
+            event_sources = {}
             if event_data.get("event_source_id"):
-                try:
-                    event_source = EventSource.objects.get(
+                event_source = (
+                    EventSource.objects.filter(
                         id=event_data["event_source_id"], project=project
                     )
-                except EventSource.DoesNotExist:
-                    logger.warning(
-                        f"Event source {event_data['event_source_id']} not found"
-                    )
-
-            # Parse timestamp
-            timestamp = timezone.now()
-            if event_data.get("timestamp"):
-                try:
-                    timestamp = datetime.fromisoformat(
-                        event_data["timestamp"].replace("Z", "+00:00")
-                    )
-                    if timezone.is_naive(timestamp):
-                        timestamp = timezone.make_aware(timestamp)
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Invalid timestamp format: {e}, using current time")
-
-            # Generate user_id if not provided
-            user_id = event_data.get("user_id")
-            if not user_id:
-                user_id = self.generate_fallback_user_id(
-                    event_data.get("ip_address", ""),
-                    event_data.get("user_agent", ""),
-                    project,
+                    .only("id", "project")
+                    .first()
                 )
-
-            # Generate session_id if not provided
-            session_id = event_data.get("session_id")
-            if not session_id and user_id:
-                session_id = self.generate_session_id(user_id, timestamp)
+                if event_source:
+                    event_sources = {event_data["event_source_id"]: event_source}
 
             # Create the Event record
-            event = Event.objects.create(
-                project=project,
-                event_source=event_source,
-                event_name=event_data["event_name"],
-                event_properties=event_data.get("event_properties", {}),
-                user_id=user_id,
-                session_id=session_id,
-                ip_address=event_data.get("ip_address", ""),
-                user_agent=event_data.get("user_agent", ""),
-                timestamp=timestamp,
-                event_id=event_data.get("event_id"),  # Optional client-provided ID
-            )
+            event = self.build_event(event_data, project, event_sources)
+            event.save()
 
-            logger.debug(f"Created event: {event.id} for project {project.name}")
+            logger.debug(f"Created event: {event.id} for project {project.id}")
             return True
 
         except Project.DoesNotExist:
@@ -205,17 +337,11 @@ class EventProcessor:
 
             return f"anonymous_{uuid4().hex[:12]}"
 
-        import hashlib
-
         # Use project ID as salt for user ID generation
-        data = f"{ip_address}|{user_agent}|{project.id}"
-        hash_obj = hashlib.sha256(data.encode())
-        return f"hash_{hash_obj.hexdigest()[:16]}"
+        return hash_user_id(ip_address, user_agent, project.id)
 
     def generate_session_id(self, user_id: str, timestamp: datetime) -> str:
         """Generate session ID based on user ID and 60-minute time window"""
-        import hashlib
-
         # Round timestamp to 60-minute windows
         window_start = timestamp.replace(
             minute=0 if timestamp.minute < 30 else 30, second=0, microsecond=0
@@ -224,7 +350,35 @@ class EventProcessor:
         # Create session ID from user + time window
         session_data = f"{user_id}_{window_start.isoformat()}"
         hash_obj = hashlib.md5(session_data.encode(), usedforsecurity=False)
-        return f"sess_{hash_obj.hexdigest()[:16]}"
+        return f"sess_{hash_obj.digest()[:8].hex()}"
+
+    def wait_for_events(self, timeout: int = 5000) -> bool:
+        """
+        Block until the stream holds events not yet delivered to the consumer group.
+        Returns True if there is work to process, False if the timeout expired.
+        """
+        try:
+            last_id = self.redis_client.xinfo_stream(self.stream_key)[
+                "last-generated-id"
+            ]
+            groups = self.redis_client.xinfo_groups(self.stream_key)
+        except redis.ResponseError:
+            # Stream doesn't exist yet, wait for the first event
+            last_id = "0-0"
+        else:
+            group_names = (self.consumer_group, self.consumer_group.encode())
+            delivered_ids = [
+                group["last-delivered-id"]
+                for group in groups
+                if group["name"] in group_names
+            ]
+            if not delivered_ids or delivered_ids[0] != last_id:
+                return True
+
+        # XREAD without a group only peeks, nothing is claimed or acknowledged
+        return bool(
+            self.redis_client.xread({self.stream_key: last_id}, count=1, block=timeout)
+        )
 
     def get_pending_message_count(self) -> int:
         """Get count of pending messages in the consumer group"""
@@ -244,18 +398,44 @@ class EventProcessor:
             return 0
 
 
+def previous_day():
+    """Default daily aggregation window: yesterday"""
+    return (timezone.now() - timedelta(days=1)).date()
+
+
+def previous_hour() -> datetime:
+    """Default hourly aggregation window: the last complete hour"""
+    now = timezone.now()
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+
+
+def previous_5min_window() -> datetime:
+    """Default 5-minute aggregation window: the last complete 5 minutes"""
+    now = timezone.now()
+    minute_rounded = (now.minute // 5) * 5
+    return now.replace(minute=minute_rounded, second=0, microsecond=0) - timedelta(
+        minutes=5
+    )
+
+
 # RQ Job functions
-def process_events_job(batch_size: int = 50, max_batches: int = 10) -> dict[str, Any]:
+def process_events_job(
+    batch_size: int | None = None, max_batches: int = 10
+) -> dict[str, Any]:
     """
     RQ job to process events from Redis stream
 
     Args:
-        batch_size: Number of events to process per batch
+        batch_size: Number of events to process per batch (default:
+            EVENT_BULK_BATCH_SIZE, so each stream read fills one INSERT)
         max_batches: Maximum number of batches to process in one job
 
     Returns:
         Dictionary with processing statistics
     """
+    if batch_size is None:
+        batch_size = settings.EVENT_BULK_BATCH_SIZE
+
     processor = EventProcessor()
 
     # Ensure consumer group exists
@@ -371,9 +551,8 @@ def aggregate_daily_events_job(date=None) -> dict[str, Any]:
         Dictionary with aggregation statistics
     """
     from datetime import date as date_class
-    from datetime import timedelta
 
-    from django.db.models import Count
+    from django.db.models import Count, Q
     from django.utils import timezone
 
     from events.models import Event
@@ -381,15 +560,15 @@ def aggregate_daily_events_job(date=None) -> dict[str, Any]:
 
     # Default to yesterday if no date provided
     if date is None:
-        date = (timezone.now() - timedelta(days=1)).date()
+        date = previous_day()
     elif isinstance(date, str):
         date = date_class.fromisoformat(date)
 
     start_time = timezone.now()
     logger.info(f"Starting daily aggregation for {date}")
 
-    aggregations_created = 0
-    summaries_created = 0
+    aggregations_written = 0
+    summaries_written = 0
     projects_processed = 0
 
     try:
@@ -398,53 +577,40 @@ def aggregate_daily_events_job(date=None) -> dict[str, Any]:
             # Get all events for this project on this date
             events_qs = Event.objects.filter(project=project, timestamp__date=date)
 
-            if not events_qs.exists():
+            # Aggregate by event_source and event_name; the source name rides
+            # along in the same GROUP BY for the source breakdown
+            aggregated_data = list(
+                events_qs.values(
+                    "event_source", "event_source__name", "event_name"
+                ).annotate(
+                    event_count=Count("id"),
+                    unique_users=Count("user_id", distinct=True),
+                    unique_sessions=Count("session_id", distinct=True),
+                )
+            )
+
+            if not aggregated_data:
                 continue  # Skip projects with no events for this date
 
             projects_processed += 1
 
-            # Aggregate by event_source and event_name
-            aggregated_data = events_qs.values("event_source", "event_name").annotate(
-                event_count=Count("id"),
-                unique_users=Count("user_id", distinct=True),
-                unique_sessions=Count("session_id", distinct=True),
-            )
-
             project_total_events = 0
             project_event_names = set()
             source_breakdown = {}
             event_breakdown = []
 
-            for data in aggregated_data:
-                # Create or update daily aggregation record
-                daily_agg, created = DailyEventAggregation.objects.get_or_create(
-                    project=project,
-                    event_source_id=data["event_source"],
-                    event_name=data["event_name"],
-                    date=date,
-                    defaults={
-                        "event_count": data["event_count"],
-                        "unique_users": data["unique_users"],
-                        "unique_sessions": data["unique_sessions"],
-                    },
-                )
-
-                if not created:
-                    # Update existing record
-                    daily_agg.event_count = data["event_count"]
-                    daily_agg.unique_users = data["unique_users"]
-                    daily_agg.unique_sessions = data["unique_sessions"]
-                    daily_agg.save()
-
-                aggregations_created += 1 if created else 0
+            aggregations_written += DailyEventAggregation.upsert_window(
+                project, date, aggregated_data
+            )
 
+            for data in aggregated_data:
                 # Accumulate project-level stats
                 project_total_events += data["event_count"]
                 project_event_names.add(data["event_name"])
 
                 # Source breakdown
                 if data["event_source"]:
-                    source_name = daily_agg.event_source.name
+                    source_name = data["event_source__name"]
                     if source_name not in source_breakdown:
                         source_breakdown[source_name] = 0
                     source_breakdown[source_name] += data["event_count"]
@@ -458,39 +624,47 @@ def aggregate_daily_events_job(date=None) -> dict[str, Any]:
                     }
                 )
 
-            # Get actual unique users and sessions for the project
-            project_users = events_qs.values_list("user_id", flat=True).distinct()
-            project_sessions = events_qs.values_list("session_id", flat=True).distinct()
+            # Get actual unique users and sessions for the project, ignoring
+            # blank IDs, counted in the database
+            project_uniques = events_qs.aggregate(
+                unique_users=Count("user_id", distinct=True, filter=~Q(user_id="")),
+                unique_sessions=Count(
+                    "session_id", distinct=True, filter=~Q(session_id="")
+                ),
+            )
 
             # Sort top events by count
             event_breakdown.sort(key=lambda x: x["event_count"], reverse=True)
             top_events = event_breakdown[:10]  # Top 10 events
 
-            # Create or update project daily summary
-            summary, created = ProjectDailySummary.objects.get_or_create(
-                project=project,
-                date=date,
-                defaults={
-                    "total_events": project_total_events,
-                    "unique_users": len([u for u in project_users if u]),
-                    "unique_sessions": len([s for s in project_sessions if s]),
-                    "unique_event_names": len(project_event_names),
-                    "source_breakdown": source_breakdown,
-                    "top_events": top_events,
-                },
+            # Create or update project daily summary in one upsert
+            ProjectDailySummary.objects.bulk_create(
+                [
+                    ProjectDailySummary(
+                        project=project,
+                        date=date,
+                        total_events=project_total_events,
+                        unique_users=project_uniques["unique_users"],
+                        unique_sessions=project_uniques["unique_sessions"],
+                        unique_event_names=len(project_event_names),
+                        source_breakdown=source_breakdown,
+                        top_events=top_events,
+                    )
+                ],
+                update_conflicts=True,
+                unique_fields=["project", "date"],
+                update_fields=[
+                    "total_events",
+                    "unique_users",
+                    "unique_sessions",
+                    "unique_event_names",
+                    "source_breakdown",
+                    "top_events",
+                    "updated_at",
+                ],
             )
 
-            if not created:
-                # Update existing summary
-                summary.total_events = project_total_events
-                summary.unique_users = len([u for u in project_users if u])
-                summary.unique_sessions = len([s for s in project_sessions if s])
-                summary.unique_event_names = len(project_event_names)
-                summary.source_breakdown = source_breakdown
-                summary.top_events = top_events
-                summary.save()
-
-            summaries_created += 1 if created else 0
+            summaries_written += 1
 
             logger.info(
                 f"Aggregated {project_total_events} events for project {project.name}"
@@ -506,8 +680,8 @@ def aggregate_daily_events_job(date=None) -> dict[str, Any]:
     stats = {
         "date": date.isoformat(),
         "projects_processed": projects_processed,
-        "aggregations_created": aggregations_created,
-        "summaries_created": summaries_created,
+        "aggregations_written": aggregations_written,
+        "summaries_written": summaries_written,
         "duration_seconds": duration,
         "completed_at": end_time.isoformat(),
     }
@@ -536,10 +710,7 @@ def aggregate_hourly_events_job(datetime_hour=None) -> dict[str, Any]:
 
     # Default to previous hour if not provided
     if datetime_hour is None:
-        now = timezone.now()
-        datetime_hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(
-            hours=1
-        )
+        datetime_hour = previous_hour()
     elif isinstance(datetime_hour, str):
         from datetime import datetime
 
@@ -548,7 +719,7 @@ def aggregate_hourly_events_job(datetime_hour=None) -> dict[str, Any]:
     start_time = timezone.now()
     logger.info(f"Starting hourly aggregation for {datetime_hour}")
 
-    aggregations_created = 0
+    aggregations_written = 0
     projects_processed = 0
     next_hour = datetime_hour + timedelta(hours=1)
 
@@ -560,40 +731,23 @@ def aggregate_hourly_events_job(datetime_hour=None) -> dict[str, Any]:
                 project=project, timestamp__gte=datetime_hour, timestamp__lt=next_hour
             )
 
-            if not events_qs.exists():
-                continue
-
-            projects_processed += 1
-
             # Aggregate by event_source and event_name
-            aggregated_data = events_qs.values("event_source", "event_name").annotate(
-                event_count=Count("id"),
-                unique_users=Count("user_id", distinct=True),
-                unique_sessions=Count("session_id", distinct=True),
+            aggregated_data = list(
+                events_qs.values("event_source", "event_name").annotate(
+                    event_count=Count("id"),
+                    unique_users=Count("user_id", distinct=True),
+                    unique_sessions=Count("session_id", distinct=True),
+                )
             )
 
-            for data in aggregated_data:
-                # Create or update hourly aggregation record
-                hourly_agg, created = HourlyEventAggregation.objects.get_or_create(
-                    project=project,
-                    event_source_id=data["event_source"],
-                    event_name=data["event_name"],
-                    datetime_hour=datetime_hour,
-                    defaults={
-                        "event_count": data["event_count"],
-                        "unique_users": data["unique_users"],
-                        "unique_sessions": data["unique_sessions"],
-                    },
-                )
+            if not aggregated_data:
+                continue  # No events in this window
 
-                if not created:
-                    # Update existing record
-                    hourly_agg.event_count = data["event_count"]
-                    hourly_agg.unique_users = data["unique_users"]
-                    hourly_agg.unique_sessions = data["unique_sessions"]
-                    hourly_agg.save()
+            projects_processed += 1
 
-                aggregations_created += 1 if created else 0
+            aggregations_written += HourlyEventAggregation.upsert_window(
+                project, datetime_hour, aggregated_data
+            )
 
     except Exception as e:
         logger.error(f"Error in aggregate_hourly_events_job: {e}", exc_info=True)
@@ -605,7 +759,7 @@ def aggregate_hourly_events_job(datetime_hour=None) -> dict[str, Any]:
     stats = {
         "datetime_hour": datetime_hour.isoformat(),
         "projects_processed": projects_processed,
-        "aggregations_created": aggregations_created,
+        "aggregations_written": aggregations_written,
         "duration_seconds": duration,
         "completed_at": end_time.isoformat(),
     }
@@ -634,12 +788,7 @@ def aggregate_5min_events_job(datetime_5min=None) -> dict[str, Any]:
 
     # Default to previous 5-minute window if not provided
     if datetime_5min is None:
-        now = timezone.now()
-        # Round down to nearest 5-minute interval
-        minute_rounded = (now.minute // 5) * 5
-        datetime_5min = now.replace(
-            minute=minute_rounded, second=0, microsecond=0
-        ) - timedelta(minutes=5)
+        datetime_5min = previous_5min_window()
     elif isinstance(datetime_5min, str):
         from datetime import datetime
 
@@ -654,7 +803,7 @@ def aggregate_5min_events_job(datetime_5min=None) -> dict[str, Any]:
     start_time = timezone.now()
     logger.info(f"Starting 5-minute aggregation for {datetime_5min}")
 
-    aggregations_created = 0
+    aggregations_written = 0
     projects_processed = 0
     next_5min = datetime_5min + timedelta(minutes=5)
 
@@ -666,40 +815,23 @@ def aggregate_5min_events_job(datetime_5min=None) -> dict[str, Any]:
                 project=project, timestamp__gte=datetime_5min, timestamp__lt=next_5min
             )
 
-            if not events_qs.exists():
-                continue
-
-            projects_processed += 1
-
             # Aggregate by event_source and event_name
-            aggregated_data = events_qs.values("event_source", "event_name").annotate(
-                event_count=Count("id"),
-                unique_users=Count("user_id", distinct=True),
-                unique_sessions=Count("session_id", distinct=True),
+            aggregated_data = list(
+                events_qs.values("event_source", "event_name").annotate(
+                    event_count=Count("id"),
+                    unique_users=Count("user_id", distinct=True),
+                    unique_sessions=Count("session_id", distinct=True),
+                )
             )
 
-            for data in aggregated_data:
-                # Create or update 5-minute aggregation record
-                fivemin_agg, created = FiveMinuteEventAggregation.objects.get_or_create(
-                    project=project,
-                    event_source_id=data["event_source"],
-                    event_name=data["event_name"],
-                    datetime_5min=datetime_5min,
-                    defaults={
-                        "event_count": data["event_count"],
-                        "unique_users": data["unique_users"],
-                        "unique_sessions": data["unique_sessions"],
-                    },
-                )
+            if not aggregated_data:
+                continue  # No events in this window
 
-                if not created:
-                    # Update existing record
-                    fivemin_agg.event_count = data["event_count"]
-                    fivemin_agg.unique_users = data["unique_users"]
-                    fivemin_agg.unique_sessions = data["unique_sessions"]
-                    fivemin_agg.save()
+            projects_processed += 1
 
-                aggregations_created += 1 if created else 0
+            aggregations_written += FiveMinuteEventAggregation.upsert_window(
+                project, datetime_5min, aggregated_data
+            )
 
     except Exception as e:
         logger.error(f"Error in aggregate_5min_events_job: {e}", exc_info=True)
@@ -711,7 +843,7 @@ def aggregate_5min_events_job(datetime_5min=None) -> dict[str, Any]:
     stats = {
         "datetime_5min": datetime_5min.isoformat(),
         "projects_processed": projects_processed,
-        "aggregations_created": aggregations_created,
+        "aggregations_written": aggregations_written,
         "duration_seconds": duration,
         "completed_at": end_time.isoformat(),
     }
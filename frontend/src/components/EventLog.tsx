@@ -12,18 +12,17 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [autoScroll, setAutoScroll] = useState(true);
-  const [totalCount, setTotalCount] = useState(0);
-  const [page, setPage] = useState(1);
+  const [nextPageUrl, setNextPageUrl] = useState<string | null>(null);
   const logContainerRef = useRef<HTMLDivElement>(null);
 
-  const loadEvents = async (_pageNum = 1, append = false) => {
+  const loadEvents = async (pageUrl: string | null = null, append = false) => {
     try {
       setLoading(true);
       setError(null);
 
       const response = await analyticsApi.getEvents({
         ...filters,
-      });
+      }, pageUrl);
 
       if (append) {
         setEvents(prev => [...prev, ...response.results]);
@@ -31,7 +30,7 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
         setEvents(response.results);
       }
 
-      setTotalCount(response.count);
+      setNextPageUrl(response.next);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load events');
     } finally {
@@ -40,8 +39,7 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
   };
 
   useEffect(() => {
-    setPage(1);
-    loadEvents(1, false);
+    loadEvents(null, false);
   }, [filters]);
 
   useEffect(() => {
@@ -51,9 +49,9 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
   }, [events, autoScroll]);
 
   const loadMoreEvents = () => {
-    const nextPage = page + 1;
-    setPage(nextPage);
-    loadEvents(nextPage, true);
+    if (nextPageUrl) {
+      loadEvents(nextPageUrl, true);
+    }
   };
 
   const formatEventData = (data: Record<string, any>) => {
@@ -85,7 +83,7 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
         <div>
           <h2 className="text-lg font-bold terminal-glow text-green-400">EVENT_LOG</h2>
           <div className="text-sm text-green-300">
-            SHOWING: {events.length.toLocaleString()} / {totalCount.toLocaleString()} EVENTS
+            SHOWING: {events.length.toLocaleString()}{nextPageUrl ? '+' : ''} EVENTS
           </div>
         </div>
         <div className="flex items-center space-x-4 text-sm">
@@ -123,7 +121,7 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
             <div className="text-red-400 terminal-glow mb-2">LOG_ERROR:</div>
             <div className="text-red-300 text-sm">{error}</div>
             <button
-              onClick={() => loadEvents(1, false)}
+              onClick={() => loadEvents(null, false)}
               className="mt-4 px-4 py-2 terminal-border bg-transparent text-green-400 hover:bg-green-900 hover:bg-opacity-20"
             >
               RETRY
@@ -183,13 +181,13 @@ const EventLog: React.FC<EventLogProps> = ({ filters }) => {
         ))}
 
         {/* Load More Button */}
-        {events.length < totalCount && !loading && (
+        {nextPageUrl && !loading && (
           <div className="text-center py-4">
             <button
               onClick={loadMoreEvents}
               className="px-6 py-2 terminal-border bg-transparent text-green-400 hover:bg-green-900 hover:bg-opacity-20"
             >
-              LOAD_MORE_EVENTS ({totalCount - events.length} remaining)
+              LOAD_MORE_EVENTS
             </button>
           </div>
         )}
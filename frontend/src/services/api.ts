@@ -19,9 +19,10 @@ export const analyticsApi = {
     return response.data;
   },
 
-  // Event querying
-  getEvents: async (params?: FilterParams): Promise<{ results: Event[], count: number }> => {
-    const response = await api.get('query/', { params });
+  // Event querying, cursor paginated: pass a previous response's `next` link
+  // (which already carries the filters) to fetch the following page
+  getEvents: async (params?: FilterParams, pageUrl?: string | null): Promise<{ results: Event[], next: string | null, previous: string | null }> => {
+    const response = pageUrl ? await api.get(pageUrl) : await api.get('query/', { params });
     return response.data;
   },
 
@@ -1,3 +1,5 @@
+import hashlib
+import random
 import secrets
 import uuid
 
@@ -132,9 +134,6 @@ class Project(models.Model):
         """
         Determine if an event should be sampled based on project/source settings
         """
-        import hashlib
-        import random
-
         # Get effective sampling settings (source overrides project)
         if event_source and event_source.sampling_enabled is not None:
             enabled = event_source.sampling_enabled
@@ -158,13 +157,13 @@ class Project(models.Model):
             return random.random() < rate
 
         elif strategy == "deterministic" and user_id:
-            # Consistent sampling based on user_id hash (not cryptographic)
-            hash_val = int(
-                hashlib.md5(
-                    f"{user_id}_{self.id}".encode(), usedforsecurity=False
-                ).hexdigest(),
-                16,
-            )  # nosec B324
+            # Consistent sampling based on user_id hash (not cryptographic).
+            # Same value as int(hexdigest, 16) without the hex round trip, so
+            # users keep their existing sampling buckets
+            digest = hashlib.md5(
+                f"{user_id}_{self.id}".encode(), usedforsecurity=False
+            ).digest()  # nosec B324
+            hash_val = int.from_bytes(digest, "big")
             return (hash_val % 1000) / 1000.0 < rate
 
         elif strategy == "time_window":
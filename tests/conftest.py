@@ -147,9 +147,28 @@ def test_settings():
         yield
 
 
+@pytest.fixture
+def locmem_cache(settings):
+    """Use an isolated in-memory cache for each test"""
+    from django.core.cache import cache
+
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
 @pytest.fixture
 def mock_redis(mocker):
     """Mock Redis for unit tests that don't need actual Redis"""
     mock_client = mocker.MagicMock()
+    # Rate limiting runs as a Lua script; allow every request by default
+    mock_client.register_script.return_value.return_value = [1, 0]
     mocker.patch("redis.from_url", return_value=mock_client)
+    mocker.patch("events.views.get_redis_client", return_value=mock_client)
+    mocker.patch("events.throttling.get_redis_client", return_value=mock_client)
+    # Scripts registered on another test's client must not be reused
+    mocker.patch.dict("events.throttling._rate_limit_scripts", clear=True)
     return mock_client
@@ -10,6 +10,7 @@ from events.authentication import (
     ApiKeyAuthentication,
     PrivateApiKeyAuthentication,
     PublicApiKeyAuthentication,
+    project_cache_key,
 )
 from tests.fixtures.test_factories import ProjectFactory
 
@@ -34,6 +35,19 @@ class TestPublicApiKeyAuthentication:
         assert user == self.project
         assert auth == self.project.public_api_key
 
+    def test_authenticate_scheme_case_insensitive(self):
+        """Test the bearer scheme is matched regardless of case"""
+        for scheme in ("bearer", "BEARER"):
+            request = self.factory.get("/")
+            request.META["HTTP_AUTHORIZATION"] = (
+                f"{scheme} {self.project.public_api_key}"
+            )
+
+            user, auth = self.auth.authenticate(request)
+
+            assert user == self.project
+            assert auth == self.project.public_api_key
+
     def test_authenticate_no_authorization_header(self):
         """Test authentication without authorization header"""
         request = self.factory.get("/")
@@ -379,3 +393,102 @@ class TestAuthenticationSecurity:
 
             with pytest.raises(AuthenticationFailed):
                 public_auth.authenticate(request)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestProjectLookupCache:
+    """Test caching of API key -> project lookups"""
+
+    def _authenticate(self, auth, api_key):
+        request = APIRequestFactory().get("/")
+        request.META["HTTP_AUTHORIZATION"] = f"Bearer {api_key}"
+        return auth.authenticate(request)
+
+    def test_repeated_lookup_served_from_cache(self, django_assert_num_queries):
+        """Test that a second authentication does not hit the database"""
+        project = ProjectFactory()
+        auth = PublicApiKeyAuthentication()
+
+        self._authenticate(auth, project.public_api_key)
+
+        with django_assert_num_queries(0):
+            user, _ = self._authenticate(auth, project.public_api_key)
+
+        assert user == project
+
+    def test_unknown_key_rejected_from_cache(self, django_assert_num_queries):
+        """Test that a repeated unknown key is rejected without a query"""
+        auth = PublicApiKeyAuthentication()
+        fake_key = "sa_" + "x" * 50
+
+        with pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, fake_key)
+
+        with django_assert_num_queries(0), pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, fake_key)
+
+    @pytest.mark.parametrize(
+        "api_key", ["sa_" + "x" * 100, "sa_key with spaces", "sa_key;DROP"]
+    )
+    def test_malformed_key_rejected_without_lookup(
+        self, api_key, django_assert_num_queries
+    ):
+        """Test that keys no project could have skip the cache and database"""
+        from django.core.cache import cache
+
+        auth = PublicApiKeyAuthentication()
+
+        with django_assert_num_queries(0), pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, api_key)
+
+        assert cache.get(project_cache_key("public_api_key", api_key)) is None
+
+    def test_reactivating_project_clears_invalid_key_marker(self):
+        """Test that a key remembered as invalid works once reactivated"""
+        project = ProjectFactory(is_active=False)
+        auth = PublicApiKeyAuthentication()
+
+        with pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, project.public_api_key)
+
+        project.is_active = True
+        project.save()
+
+        user, _ = self._authenticate(auth, project.public_api_key)
+        assert user == project
+
+    def test_deactivating_project_invalidates_cache(self):
+        """Test that saving a project drops its cached lookups"""
+        project = ProjectFactory()
+        auth = PrivateApiKeyAuthentication()
+        self._authenticate(auth, project.private_api_key)
+
+        project.is_active = False
+        project.save()
+
+        with pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, project.private_api_key)
+
+    def test_regenerated_key_invalidates_cached_old_key(self):
+        """Test that a cached old key stops working after regeneration"""
+        project = ProjectFactory()
+        auth = PublicApiKeyAuthentication()
+        old_key = project.public_api_key
+        self._authenticate(auth, old_key)
+
+        project.regenerate_public_api_key()
+
+        with pytest.raises(AuthenticationFailed):
+            self._authenticate(auth, old_key)
+
+    def test_cache_keys_do_not_contain_api_keys(self):
+        """Test that cached lookups are keyed by a hash of the API key"""
+        from django.core.cache import cache
+
+        project = ProjectFactory()
+        self._authenticate(PublicApiKeyAuthentication(), project.public_api_key)
+
+        cache_key = project_cache_key("public_api_key", project.public_api_key)
+        assert project.public_api_key not in cache_key
+        assert cache.get(cache_key) == project
@@ -2,15 +2,25 @@
 Unit tests for Dashboard API endpoints
 """
 
+import json
 from datetime import timedelta
 
+from django.db import connection
 from django.urls import reverse
 from django.utils import timezone
 
 import pytest
 from rest_framework import status
-from rest_framework.test import APIClient
-
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from events.models import Event
+from events.models_aggregation import HourlyEventAggregation, ProjectDailySummary
+from events.serializers import EventSerializer
+from events.views_dashboard import get_time_range_filters
+from events.workers import aggregate_daily_events_job
 from tests.fixtures.test_factories import (
     EventFactory,
     EventSourceFactory,
@@ -18,6 +28,21 @@ from tests.fixtures.test_factories import (
 )
 
 
+class TestTimeRangeFilters:
+    """Test the shared query parameter filter parsing"""
+
+    def make_request(self, params):
+        return Request(APIRequestFactory().get("/", params))
+
+    def test_invalid_filters(self):
+        """Test that invalid filters are ignored unless raising is requested"""
+        request = self.make_request({"start_date": "not-a-date"})
+
+        assert get_time_range_filters(request) == {}
+        with pytest.raises(ValidationError):
+            get_time_range_filters(request, raise_exception=True)
+
+
 @pytest.mark.django_db
 class TestDashboardAPIAuthentication:
     """Test authentication for Dashboard API endpoints"""
@@ -128,7 +153,6 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 0
         assert data["results"] == []
 
     def test_query_with_events(self):
@@ -148,7 +172,6 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 5
         assert len(data["results"]) == 5
 
         # Check serialized data
@@ -159,6 +182,65 @@ class TestEventQueryView:
         assert "event_source_name" in first_result
         assert "timestamp" in first_result
 
+    def test_query_count_does_not_grow_with_events(self, django_assert_max_num_queries):
+        """Test that related names are loaded without a query per event"""
+        other_source = EventSourceFactory(project=self.project)
+        for i in range(10):
+            EventFactory(
+                project=self.project,
+                event_source=self.event_source if i % 2 else other_source,
+            )
+
+        url = reverse("events:query")
+        # API key lookup and the joined event query; no COUNT(*) per page
+        with django_assert_max_num_queries(2):
+            response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        names = {event["event_source_name"] for event in response.json()["results"]}
+        assert names == {self.event_source.name, other_source.name}
+        assert response.json()["results"][0]["project_name"] == self.project.name
+
+    def test_results_match_event_serializer(self):
+        """Test that rows rendered from .values() match EventSerializer output"""
+        EventFactory(project=self.project, event_source=self.event_source)
+        EventFactory(project=self.project, event_source=None)
+
+        url = reverse("events:query")
+        response = self.client.get(url)
+
+        events = Event.objects.order_by("-timestamp", "-id")
+        expected = json.loads(
+            JSONRenderer().render(EventSerializer(events, many=True).data)
+        )
+        assert response.json()["results"] == expected
+        assert any("event_source_name" not in event for event in expected)
+
+    def test_ndjson_export_streams_all_events(self):
+        """Test that the NDJSON export streams every event, one per line"""
+        for _ in range(3):
+            EventFactory(project=self.project, event_source=self.event_source)
+
+        url = reverse("events:query")
+        paginated = self.client.get(url).json()["results"]
+        response = self.client.get(url, {"format": "ndjson", "page_size": 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == paginated
+
+    def test_ndjson_export_rejects_invalid_filters(self):
+        """Test that invalid filters still return a 400 for exports"""
+        url = reverse("events:query")
+        response = self.client.get(
+            url, {"format": "ndjson", "start_date": "invalid-date-format"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "start_date" in json.loads(response.content)
+
     def test_project_isolation(self):
         """Test that users only see events from their project"""
         # Create events for our project
@@ -175,7 +257,7 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 2  # Only our events
+        assert len(data["results"]) == 2  # Only our events
 
         event_names = [event["event_name"] for event in data["results"]]
         assert "our_event_1" in event_names
@@ -206,7 +288,7 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 1
+        assert len(data["results"]) == 1
         assert data["results"][0]["event_name"] == "recent_event"
 
     def test_event_name_filtering(self):
@@ -220,7 +302,7 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 2
+        assert len(data["results"]) == 2
         for event in data["results"]:
             assert event["event_name"] == "page_view"
 
@@ -235,12 +317,37 @@ class TestEventQueryView:
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 2
+        assert len(data["results"]) == 2
         for event in data["results"]:
             assert event["user_id"] == "user_123"
 
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql",
+        reason="JSON containment lookups need PostgreSQL",
+    )
+    def test_properties_filtering(self):
+        """Test filtering events by contained properties"""
+        EventFactory(project=self.project, event_properties={"plan": "pro", "n": 1})
+        EventFactory(project=self.project, event_properties={"plan": "free"})
+
+        url = reverse("events:query")
+        response = self.client.get(url, {"properties": json.dumps({"plan": "pro"})})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["results"]) == 1
+        assert data["results"][0]["event_properties"] == {"plan": "pro", "n": 1}
+
+    def test_properties_filter_must_be_object(self):
+        """Test that a properties filter that isn't a JSON object is rejected"""
+        url = reverse("events:query")
+        response = self.client.get(url, {"properties": '["plan"]'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "properties" in response.json()
+
     def test_pagination(self):
-        """Test pagination functionality"""
+        """Test cursor pagination functionality"""
         # Create 25 events
         for i in range(25):
             EventFactory(project=self.project, event_name=f"event_{i:02d}")
@@ -251,21 +358,45 @@ class TestEventQueryView:
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert data["count"] == 25
         assert len(data["results"]) == 25
+        assert data["next"] is None
 
         # Test custom page size
         response = self.client.get(url, {"page_size": 10})
         data = response.json()
-        assert data["count"] == 25
         assert len(data["results"]) == 10
         assert data["next"] is not None
+        first_page = [event["id"] for event in data["results"]]
 
-        # Second page
-        response = self.client.get(url, {"page": 2, "page_size": 10})
+        # Second page follows the cursor
+        response = self.client.get(data["next"])
         data = response.json()
         assert len(data["results"]) == 10
         assert data["previous"] is not None
+        second_page = [event["id"] for event in data["results"]]
+        assert not set(first_page) & set(second_page)
+
+        # Third page holds the rest
+        data = self.client.get(data["next"]).json()
+        assert len(data["results"]) == 5
+        assert data["next"] is None
+
+    def test_pagination_with_equal_timestamps(self):
+        """Test that events sharing a timestamp are neither skipped nor repeated"""
+        timestamp = timezone.now() - timedelta(hours=1)
+        for _ in range(5):
+            EventFactory(project=self.project, timestamp=timestamp)
+
+        url = reverse("events:query")
+        seen = []
+        data = self.client.get(url, {"page_size": 2}).json()
+        seen += [event["id"] for event in data["results"]]
+        while data["next"]:
+            data = self.client.get(data["next"]).json()
+            seen += [event["id"] for event in data["results"]]
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
 
     def test_ordering(self):
         """Test that events are ordered by timestamp descending"""
@@ -298,6 +429,68 @@ class TestEventQueryView:
         assert event_names == ["newest", "middle", "oldest"]
 
 
+@pytest.mark.django_db
+class TestProjectSummaryView:
+    """Test the ProjectSummaryView endpoint"""
+
+    def test_query_count_does_not_grow_with_summaries(
+        self, django_assert_max_num_queries
+    ):
+        """Test that the project name needs no join or query per row"""
+        project = ProjectFactory()
+        today = timezone.now().date()
+        for days in range(2):
+            ProjectDailySummary.objects.create(
+                project=project, date=today - timedelta(days=days), total_events=days
+            )
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {project.private_api_key}")
+        url = reverse("events:daily_summaries")
+        # API key lookup, page count and the summary query
+        with django_assert_max_num_queries(3) as queries:
+            response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert len(results) == 2
+        assert {row["project_name"] for row in results} == {project.name}
+        assert '"projects"' not in queries.captured_queries[-1]["sql"]
+
+
+@pytest.mark.django_db
+class TestAggregationViews:
+    """Test the rollup listing endpoints"""
+
+    def test_rows_reuse_authenticated_project(self, django_assert_max_num_queries):
+        """Test that rollup rows are listed without joining the project"""
+        project = ProjectFactory()
+        event_source = EventSourceFactory(project=project)
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        for event_name in ("page_view", "signup"):
+            HourlyEventAggregation.objects.create(
+                project=project,
+                event_source=event_source,
+                event_name=event_name,
+                datetime_hour=hour,
+                event_count=1,
+            )
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {project.private_api_key}")
+        url = reverse("events:hourly_aggregations")
+        # API key lookup, page count and the rollup query joined to its source
+        with django_assert_max_num_queries(3) as queries:
+            response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert len(results) == 2
+        assert {row["project_name"] for row in results} == {project.name}
+        assert {row["event_source_name"] for row in results} == {event_source.name}
+        assert '"projects"' not in queries.captured_queries[-1]["sql"]
+
+
 @pytest.mark.django_db
 class TestRealTimeMetricsView:
     """Test the real-time metrics endpoint"""
@@ -370,6 +563,38 @@ class TestRealTimeMetricsView:
         assert data["active_users_today"] == 2  # user1 and user2
         assert len(data["top_events_today"]) > 0
 
+    def test_counters_share_one_query(self, django_assert_max_num_queries):
+        """Test that the time-window counters are computed in a single query"""
+        for minutes in (5, 10, 15):
+            EventFactory(
+                project=self.project,
+                timestamp=timezone.now() - timedelta(minutes=minutes),
+            )
+        url = reverse("events:realtime_metrics")
+
+        # Project lookup, the counters, top events (hourly rollups and raw
+        # events) and event sources
+        with django_assert_max_num_queries(5):
+            response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["last_24h_events"] == 3
+
+    @pytest.mark.usefixtures("locmem_cache")
+    def test_repeated_poll_served_from_cache(self, django_assert_max_num_queries):
+        """Test that polling within the cache window skips the event queries"""
+        url = reverse("events:realtime_metrics")
+
+        EventFactory(project=self.project)
+        first = self.client.get(url).json()
+
+        # A new event is not visible until the cached metrics expire
+        EventFactory(project=self.project)
+        with django_assert_max_num_queries(1):
+            second = self.client.get(url).json()
+
+        assert second == first
+
     def test_project_isolation_in_metrics(self):
         """Test that metrics only include events from authenticated project"""
         other_project = ProjectFactory()
@@ -424,6 +649,19 @@ class TestEventNamesAndSourcesViews:
         assert "button_click" in data["event_names"]
         assert data["count"] == 2
 
+    def test_event_names_include_rolled_up_days(self):
+        """Test that names from rolled-up days are listed without raw events"""
+        yesterday = timezone.now() - timedelta(days=1)
+        EventFactory(project=self.project, event_name="signup", timestamp=yesterday)
+        aggregate_daily_events_job(date=timezone.localtime(yesterday).date())
+        Event.objects.filter(project=self.project).delete()
+        EventFactory(project=self.project, event_name="page_view")
+
+        url = reverse("events:event_names")
+        response = self.client.get(url)
+
+        assert response.json()["event_names"] == ["page_view", "signup"]
+
     def test_event_names_project_isolation(self):
         """Test that event names are isolated by project"""
         other_project = ProjectFactory()
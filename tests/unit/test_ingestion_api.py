@@ -0,0 +1,251 @@
+"""
+Unit tests for the Event Ingestion API endpoints
+"""
+
+import json
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from events.serializers import EventIngestionSerializer
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestEventIngestionQueryBudget:
+    """Query budgets for the single-event ingestion endpoint"""
+
+    url = reverse("events:ingest")
+
+    @pytest.mark.parametrize("sampling_rate", [0.0, 0.5, 1.0])
+    def test_ingestion_query_budget(
+        self,
+        authenticated_client,
+        mock_redis,
+        project,
+        event_source,
+        sampling_rate,
+        django_assert_max_num_queries,
+    ):
+        """Test that ingestion cost does not depend on sampling or cache state"""
+        project.sampling_enabled = True
+        project.sampling_rate = sampling_rate
+        project.save()
+        data = {"event_name": "page_view", "event_source": event_source.name}
+
+        # Cold caches: the project lookup by API key and the event source lookup
+        with django_assert_max_num_queries(2):
+            response = authenticated_client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        # Both lookups are cached, so repeat requests never touch the database
+        with django_assert_max_num_queries(0):
+            response = authenticated_client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+
+@pytest.mark.django_db
+class TestEventIngestionBodySize:
+    """Test cases for rejecting oversized ingestion bodies"""
+
+    url = reverse("events:ingest")
+
+    def test_oversized_body_rejected_before_parsing(
+        self, authenticated_client, mock_redis, django_assert_num_queries
+    ):
+        """Test that a body over the limit gets a 413 without any other work"""
+        data = {"event_name": "page_view", "properties": {"blob": "x" * 200_000}}
+
+        with django_assert_num_queries(0):
+            response = authenticated_client.post(self.url, data, format="json")
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        mock_redis.register_script.return_value.assert_not_called()
+        mock_redis.xadd.assert_not_called()
+
+    def test_oversized_properties_still_validated(
+        self, authenticated_client, mock_redis
+    ):
+        """Test that properties over their own limit are still a 400"""
+        data = {"event_name": "page_view", "properties": {"blob": "x" * 70_000}}
+
+        response = authenticated_client.post(self.url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestEventBulkIngestionView:
+    """Test cases for the bulk ingestion endpoint"""
+
+    url = reverse("events:ingest_bulk")
+
+    def test_bulk_requires_public_key(self, api_client, mock_redis):
+        """Test that bulk ingestion requires authentication"""
+        response = api_client.post(
+            self.url, {"events": [{"event_name": "page_view"}]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_bulk_queues_events_through_pipeline(
+        self, authenticated_client, mock_redis
+    ):
+        """Test that a valid batch is queued through a Redis pipeline"""
+        events = [{"event_name": f"event_{i}"} for i in range(3)]
+
+        response = authenticated_client.post(
+            self.url, {"events": events}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data == {"status": "accepted", "accepted": 3, "sampled": 0}
+
+        # The throttle shares the mocked client, so check the stream writes only
+        assert mock_redis.pipeline.return_value.xadd.call_count == 3
+        mock_redis.xadd.assert_not_called()
+
+    def test_bulk_caps_stream_length(self, authenticated_client, mock_redis, settings):
+        """Test that queued events trim the stream to its approximate cap"""
+        settings.EVENT_STREAM_MAXLEN = 5000
+
+        authenticated_client.post(
+            self.url, {"events": [{"event_name": "page_view"}]}, format="json"
+        )
+
+        call = mock_redis.pipeline.return_value.xadd.call_args
+        assert call.kwargs == {"maxlen": 5000, "approximate": True}
+
+    def test_bulk_events_share_request_timestamp(
+        self, authenticated_client, mock_redis
+    ):
+        """Test that events without a timestamp get one aware request time"""
+        events = [{"event_name": f"event_{i}"} for i in range(3)]
+
+        authenticated_client.post(self.url, {"events": events}, format="json")
+
+        timestamps = {
+            json.loads(call.args[1]["event_data"])["timestamp"]
+            for call in mock_redis.pipeline.return_value.xadd.call_args_list
+        }
+        assert len(timestamps) == 1
+        assert timestamps.pop().endswith("+00:00")
+
+    def test_bulk_events_record_client_metadata(self, authenticated_client, mock_redis):
+        """Test that the first forwarded hop and the user agent are queued"""
+        authenticated_client.post(
+            self.url,
+            {"events": [{"event_name": "page_view"}]},
+            format="json",
+            HTTP_X_FORWARDED_FOR=" 203.0.113.7 , 10.0.0.1",
+            HTTP_USER_AGENT="pytest-agent",
+        )
+
+        call = mock_redis.pipeline.return_value.xadd.call_args
+        event_data = json.loads(call.args[1]["event_data"])
+        assert event_data["ip_address"] == "203.0.113.7"
+        assert event_data["user_agent"] == "pytest-agent"
+
+    def test_bulk_rejects_invalid_event(self, authenticated_client, mock_redis):
+        """Test that one invalid event rejects the whole batch"""
+        events = [{"event_name": "valid"}, {"event_name": ""}]
+
+        response = authenticated_client.post(
+            self.url, {"events": events}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "details" in response.data
+        mock_redis.pipeline.return_value.xadd.assert_not_called()
+
+    @pytest.mark.parametrize("body", [{}, {"events": []}, {"events": "nope"}])
+    def test_bulk_rejects_missing_events_list(
+        self, authenticated_client, mock_redis, body
+    ):
+        """Test that the body must contain a non-empty events list"""
+        response = authenticated_client.post(self.url, body, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_oversized_body_rejected_before_parsing(
+        self, authenticated_client, mock_redis, django_assert_num_queries
+    ):
+        """Test that a body over the batch limit gets a 413 without any other work"""
+        event = {"event_name": "page_view", "properties": {"blob": "x" * 14_000_000}}
+
+        with django_assert_num_queries(0):
+            response = authenticated_client.post(
+                self.url, {"events": [event]}, format="json"
+            )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        mock_redis.register_script.return_value.assert_not_called()
+        mock_redis.pipeline.return_value.xadd.assert_not_called()
+
+    def test_bulk_rejects_oversized_batch(self, authenticated_client, mock_redis):
+        """Test that batches above the size limit are rejected"""
+        events = [{"event_name": "page_view"}] * 101
+
+        response = authenticated_client.post(
+            self.url, {"events": events}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Too many events" in response.data["error"]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestEventSourceLookupCache:
+    """Test caching of (project, source name) -> event source lookups"""
+
+    def test_repeated_lookup_served_from_cache(
+        self, project, django_assert_num_queries
+    ):
+        """Test that a known source name does not hit the database again"""
+        serializer = EventIngestionSerializer()
+        source = serializer.create_or_get_event_source(project, "web_app")
+
+        with django_assert_num_queries(0):
+            cached = serializer.create_or_get_event_source(project, "web_app")
+
+        assert cached == source
+
+    def test_lookup_loads_only_ingestion_fields(self, project, event_source):
+        """Test that an existing source is fetched without unused columns"""
+        serializer = EventIngestionSerializer()
+        source = serializer.create_or_get_event_source(project, event_source.name)
+
+        assert source == event_source
+        assert "description" in source.get_deferred_fields()
+
+    def test_rename_invalidates_cache(self, project):
+        """Test that a renamed source is no longer returned for its old name"""
+        serializer = EventIngestionSerializer()
+        source = serializer.create_or_get_event_source(project, "web_app")
+
+        source.name = "renamed"
+        source.save()
+
+        fresh = serializer.create_or_get_event_source(project, "web_app")
+        assert fresh.pk != source.pk
+
+
+class TestEventIngestionSerializerFields:
+    """Test the per-instance field copies of EventIngestionSerializer"""
+
+    def test_instances_do_not_share_bound_fields(self):
+        """Test that each serializer binds its own copies of the fields"""
+        valid = EventIngestionSerializer(data={"event_name": "page_view"})
+        invalid = EventIngestionSerializer(data={"event_name": "x" * 256})
+
+        assert valid.is_valid()
+        assert not invalid.is_valid()
+        assert "event_name" in invalid.errors
+
+        for name, field in valid.fields.items():
+            assert field is not invalid.fields[name]
+            assert field is not EventIngestionSerializer._declared_fields[name]
+            assert field.parent is valid
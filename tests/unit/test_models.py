@@ -2,6 +2,8 @@
 Unit tests for Project and EventSource models
 """
 
+import hashlib
+
 from django.db import IntegrityError
 
 import pytest
@@ -180,6 +182,20 @@ class TestProjectModel:
         assert True in different_results
         assert False in different_results
 
+    def test_should_sample_event_deterministic_buckets_are_stable(self):
+        """Test that users keep the bucket derived from the hex digest"""
+        project = ProjectFactory(
+            sampling_enabled=True, sampling_rate=0.5, sampling_strategy="deterministic"
+        )
+
+        for i in range(50):
+            user_id = f"user_{i}"
+            data = f"{user_id}_{project.id}".encode()
+            bucket = int(hashlib.md5(data, usedforsecurity=False).hexdigest(), 16)
+            expected = (bucket % 1000) / 1000.0 < 0.5
+
+            assert project.should_sample_event(user_id=user_id) is expected
+
     def test_should_sample_event_time_window(self):
         """Test time window sampling"""
         project = ProjectFactory(
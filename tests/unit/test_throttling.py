@@ -0,0 +1,138 @@
+"""
+Unit tests for event ingestion rate limiting
+"""
+
+from django.test import RequestFactory
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from events.throttling import (
+    FIXED_WINDOW_SCRIPT,
+    SLIDING_WINDOW_SCRIPT,
+    EventIngestionThrottle,
+)
+
+
+class TestEventIngestionThrottle:
+    """Test cases for the sliding window rate limit check"""
+
+    def test_window_is_checked_in_one_script_call(self, mock_redis):
+        """Test that the check is a single script call rather than a pipeline"""
+        throttle = EventIngestionThrottle()
+
+        assert throttle.check_rate_limit("rate_limit:test", limit=5) == (True, None)
+
+        mock_redis.register_script.assert_called_once_with(FIXED_WINDOW_SCRIPT)
+        script = mock_redis.register_script.return_value
+        script.assert_called_once()
+        assert script.call_args.kwargs["keys"] == ["rate_limit:test"]
+        assert script.call_args.kwargs["args"][1:] == [60, 1, 5]
+        mock_redis.pipeline.assert_not_called()
+
+    def test_sliding_window_can_be_configured(self, mock_redis, settings):
+        """Test that the exact sliding window is used when configured"""
+        settings.RATE_LIMIT_STRATEGY = "sliding_window"
+
+        EventIngestionThrottle().check_rate_limit("rate_limit:test", limit=5)
+
+        mock_redis.register_script.assert_called_once_with(SLIDING_WINDOW_SCRIPT)
+
+    def test_script_registered_once_per_process(self, mock_redis):
+        """Test that new throttle instances reuse the registered script"""
+        EventIngestionThrottle().check_rate_limit("rate_limit:test", limit=5)
+        EventIngestionThrottle().check_rate_limit("rate_limit:test", limit=5)
+
+        mock_redis.register_script.assert_called_once_with(FIXED_WINDOW_SCRIPT)
+        assert mock_redis.register_script.return_value.call_count == 2
+
+    def test_rejection_returns_retry_after(self, mock_redis):
+        """Test that a full window reports the script's retry-after"""
+        mock_redis.register_script.return_value.return_value = [0, 42]
+
+        throttle = EventIngestionThrottle()
+
+        assert throttle.check_rate_limit("rate_limit:test", limit=5) == (False, 42)
+
+    def test_redis_failure_fails_open(self, mock_redis):
+        """Test that Redis errors allow the request through"""
+        mock_redis.register_script.return_value.side_effect = ConnectionError()
+
+        throttle = EventIngestionThrottle()
+
+        assert throttle.check_rate_limit("rate_limit:test", limit=5) == (True, None)
+
+    @pytest.mark.django_db
+    def test_project_and_ip_limits_share_one_call(self, mock_redis, project):
+        """Test that allow_request checks both limits in one round trip"""
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+        request.user = project
+
+        throttle = EventIngestionThrottle()
+
+        assert throttle.allow_request(request, view=None)
+
+        script = mock_redis.register_script.return_value
+        script.assert_called_once()
+        assert script.call_args.kwargs["keys"] == [
+            f"rate_limit:project:{project.id}",
+            "rate_limit:ip:10.0.0.1",
+        ]
+        assert script.call_args.kwargs["args"][1:] == [
+            60,
+            1,
+            project.rate_limit_per_minute,
+            1000,
+        ]
+
+    @pytest.mark.django_db
+    def test_throttled_request_sets_retry_after(self, authenticated_client, mock_redis):
+        """Test that a rejected request gets a 429 with a Retry-After header"""
+        mock_redis.register_script.return_value.return_value = [0, 30]
+
+        response = authenticated_client.post(
+            reverse("events:ingest"), {"event_name": "page_view"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["Retry-After"] == "30"
+        mock_redis.xadd.assert_not_called()
+
+    @pytest.mark.django_db
+    def test_bulk_request_is_charged_per_event(self, authenticated_client, mock_redis):
+        """Test that a bulk request costs one hit for each event it carries"""
+        authenticated_client.post(
+            reverse("events:ingest_bulk"),
+            {"events": [{"event_name": "page_view"}] * 3},
+            format="json",
+        )
+
+        script = mock_redis.register_script.return_value
+        script.assert_called_once()
+        assert script.call_args.kwargs["args"][2] == 3
+
+    @pytest.mark.django_db
+    def test_oversized_bulk_request_cost_is_capped(
+        self, authenticated_client, mock_redis
+    ):
+        """Test that a batch over the size limit costs at most a full batch"""
+        response = authenticated_client.post(
+            reverse("events:ingest_bulk"),
+            {"events": [{"event_name": "page_view"}] * 10_000},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        script = mock_redis.register_script.return_value
+        assert script.call_args.kwargs["args"][2] == 100
+
+    def test_unauthenticated_request_skips_redis(self, mocker):
+        """Test that requests without a project never create a Redis client"""
+        get_client = mocker.patch("events.throttling.get_redis_client")
+        request = RequestFactory().post("/")
+        request.user = None
+
+        assert EventIngestionThrottle().allow_request(request, view=None)
+
+        get_client.assert_not_called()
@@ -0,0 +1,400 @@
+"""
+Unit tests for the Redis stream event workers
+"""
+
+import hashlib
+import uuid
+from datetime import UTC, datetime, timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+from rq import Queue
+from rq.job import Job, JobStatus
+
+from events.management.commands.aggregate_events import (
+    Command as AggregateEventsCommand,
+)
+from events.models import Event
+from events.models_aggregation import HourlyEventAggregation, ProjectDailySummary
+from events.workers import (
+    EventProcessor,
+    aggregate_daily_events_job,
+    aggregate_hourly_events_job,
+    process_events_job,
+)
+from tests.fixtures.test_factories import EventFactory
+
+
+@pytest.mark.django_db
+class TestCreateEventRecords:
+    """Test cases for batched event storage in EventProcessor"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.processor = EventProcessor()
+
+    def build_event_data(self, project, event_source=None, **overrides):
+        return {
+            "project_id": str(project.id),
+            "event_source_id": str(event_source.id) if event_source else None,
+            "event_name": "page_view",
+            "event_properties": {"page": "/"},
+            "user_id": "user_1",
+            "session_id": "session_1",
+            "ip_address": "127.0.0.1",
+            "user_agent": "pytest",
+            "timestamp": "2026-01-01T10:00:00Z",
+            **overrides,
+        }
+
+    def test_batch_is_stored_with_bulk_insert(
+        self, project, event_source, django_assert_max_num_queries
+    ):
+        """Test that a batch costs a fixed number of queries"""
+        parsed = [
+            (f"1-{i}", self.build_event_data(project, event_source)) for i in range(20)
+        ]
+
+        # Project and source lookups, the insert and the source activity update
+        with django_assert_max_num_queries(6):
+            stored_ids = self.processor.create_event_records(parsed)
+
+        assert stored_ids == [message_id for message_id, _ in parsed]
+        assert Event.objects.filter(project=project).count() == 20
+
+        event_source.refresh_from_db()
+        assert event_source.last_event_at is not None
+
+    def test_lookups_load_only_keys(
+        self, project, event_source, django_assert_max_num_queries
+    ):
+        """Test that project and source lookups skip unused columns"""
+        parsed = [("1-0", self.build_event_data(project, event_source))]
+
+        with django_assert_max_num_queries(6) as queries:
+            self.processor.create_event_records(parsed)
+
+        lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        assert len(lookups) == 2
+        assert not any('"name"' in sql for sql in lookups)
+
+        # The fallback path stores events the same way
+        parsed = [("1-1", self.build_event_data(project, event_source))]
+        assert self.processor.create_events_individually(parsed) == ["1-1"]
+        assert Event.objects.filter(event_source=event_source).count() == 2
+
+    def test_events_for_unknown_projects_are_skipped(self, project):
+        """Test that only events for active projects are stored and acknowledged"""
+        missing = self.build_event_data(project, project_id=str(uuid.uuid4()))
+        parsed = [("1-0", self.build_event_data(project)), ("1-1", missing)]
+
+        stored_ids = self.processor.create_event_records(parsed)
+
+        assert stored_ids == ["1-0"]
+        assert Event.objects.count() == 1
+
+    def test_primary_keys_are_time_ordered(self, project):
+        """Test that stored events get UUIDv7 primary keys"""
+        self.processor.create_event_records([("1-0", self.build_event_data(project))])
+
+        assert Event.objects.get().id.version == 7
+
+    def test_missing_ids_are_generated(self, project):
+        """Test that user and session IDs are filled in without Event.save()"""
+        parsed = [
+            ("1-0", self.build_event_data(project, user_id=None, session_id=None))
+        ]
+
+        self.processor.create_event_records(parsed)
+
+        event = Event.objects.get()
+        assert event.user_id.startswith("hash_")
+        assert event.session_id.startswith("sess_")
+
+
+class TestProcessEventsJob:
+    """Test cases for the stream draining RQ job"""
+
+    def test_reads_match_insert_batch_size(self, settings):
+        """Test that each stream read defaults to one bulk INSERT's worth"""
+        settings.EVENT_BULK_BATCH_SIZE = 123
+
+        with patch("events.workers.EventProcessor") as processor_class:
+            processor = processor_class.return_value
+            processor.process_event_batch.return_value = 0
+            process_events_job()
+            process_events_job(batch_size=10)
+
+        counts = [
+            call.kwargs["count"]
+            for call in processor.process_event_batch.call_args_list
+        ]
+        assert counts == [123, 10]
+
+
+class TestProcessEventsCommand:
+    """Test cases for the continuous process_events loop"""
+
+    def test_expired_job_is_treated_as_finished(self):
+        """Test that a job whose hash has expired doesn't stop the loop"""
+        connection = MagicMock()
+        connection.hget.return_value = None  # Job hash already deleted
+        expired_job = Job("expired-job", connection=connection)
+
+        command = "events.management.commands.process_events"
+        with (
+            patch(f"{command}.get_queue") as get_queue,
+            patch(f"{command}.EventProcessor") as processor_class,
+        ):
+            queue = get_queue.return_value
+            queue.enqueue.return_value = expired_job
+            processor_class.return_value.wait_for_events.side_effect = [
+                True,
+                True,
+                KeyboardInterrupt,
+            ]
+            call_command("process_events", stdout=StringIO())
+
+        assert queue.enqueue.call_count == 2
+
+
+class TestAggregateEventsCommand:
+    """Test cases for enqueueing aggregation jobs"""
+
+    def test_pending_check_uses_fetched_status(self):
+        """Test that batch-fetched jobs are not re-read one by one"""
+        connection = MagicMock()
+        queued_job = Job("aggregate_daily_20260101", connection=connection)
+        queued_job.set_status(JobStatus.QUEUED, pipeline=MagicMock())
+        queue = MagicMock(connection=connection)
+        job_data = Queue.prepare_data(
+            aggregate_daily_events_job, job_id="aggregate_daily_20260101"
+        )
+
+        with patch.object(Job, "fetch_many", return_value=[queued_job]):
+            jobs = AggregateEventsCommand().enqueue_pending(queue, [job_data])
+
+        assert jobs == [None]
+        queue.enqueue_many.assert_not_called()
+        connection.hget.assert_not_called()
+
+
+class TestParseEventData:
+    """Test cases for decoding stream messages"""
+
+    def test_bytes_fields_are_parsed(self):
+        """Test that raw bytes from Redis decode without a separate step"""
+        fields = {b"event_data": b'{"event_name": "page_view"}'}
+
+        parsed = EventProcessor().parse_event_data("1-0", fields)
+
+        assert parsed == {"event_name": "page_view"}
+
+    def test_missing_event_data_is_rejected(self):
+        """Test that messages without event_data are skipped"""
+        assert EventProcessor().parse_event_data("1-0", {b"other": b"1"}) is None
+
+
+@pytest.mark.django_db
+class TestGeneratedIds:
+    """Test cases for fallback user and session ID generation"""
+
+    def test_fallback_user_id_is_stable(self, project):
+        """Test that fallback user IDs keep their established value"""
+        data = f"127.0.0.1|pytest|{project.id}".encode()
+        expected = f"hash_{hashlib.sha256(data).hexdigest()[:16]}"
+
+        user_id = EventProcessor().generate_fallback_user_id(
+            "127.0.0.1", "pytest", project
+        )
+
+        assert user_id == expected
+
+    def test_session_id_is_stable(self):
+        """Test that generated session IDs keep their established value"""
+        timestamp = datetime(2026, 1, 1, 10, 47, 12, tzinfo=UTC)
+        data = b"user_1_2026-01-01T10:30:00+00:00"
+        expected = f"sess_{hashlib.md5(data).hexdigest()[:16]}"
+
+        processor = EventProcessor()
+        session_id = processor.generate_session_id("user_1", timestamp)
+
+        assert session_id == expected
+        # Events in the same half-hour window share the session
+        same_window = timestamp.replace(minute=31)
+        assert processor.generate_session_id("user_1", same_window) == expected
+        # The window is labelled with its own offset, so the same instant in
+        # another timezone is a different session
+        other_offset = datetime.fromisoformat("2026-01-01T11:47:12+01:00")
+        assert processor.generate_session_id("user_1", other_offset) != expected
+
+
+@pytest.mark.django_db
+class TestAggregationUpsert:
+    """Test cases for re-running aggregation jobs over the same window"""
+
+    hour = datetime(2026, 1, 1, 10, tzinfo=UTC)
+
+    def create_events(self, project, event_source, count):
+        for i in range(count):
+            timestamp = self.hour + timedelta(minutes=i)
+            EventFactory(
+                project=project,
+                event_source=event_source,
+                event_name="page_view",
+                timestamp=timestamp,
+            )
+            EventFactory(
+                project=project,
+                event_source=None,
+                event_name="page_view",
+                timestamp=timestamp,
+            )
+
+    def test_rerun_replaces_counts(self, project, event_source):
+        """Test that re-aggregating updates rows instead of duplicating them"""
+        self.create_events(project, event_source, 2)
+
+        stats = aggregate_hourly_events_job(datetime_hour=self.hour)
+        assert stats["aggregations_written"] == 2
+
+        self.create_events(project, event_source, 1)
+        stats = aggregate_hourly_events_job(datetime_hour=self.hour)
+        assert stats["aggregations_written"] == 2
+
+        rows = HourlyEventAggregation.objects.filter(project=project)
+        assert rows.count() == 2
+        assert {row.event_count for row in rows} == {3}
+
+    def test_empty_window_costs_one_query_per_project(
+        self, project, django_assert_num_queries
+    ):
+        """Test that projects without events are skipped after the grouping"""
+        # Active projects, then the (empty) grouped events query
+        with django_assert_num_queries(2):
+            stats = aggregate_hourly_events_job(datetime_hour=self.hour)
+
+        assert stats["projects_processed"] == 0
+        assert not HourlyEventAggregation.objects.exists()
+
+    def test_window_with_sources_is_written_without_reads(
+        self, project, event_source, django_assert_num_queries
+    ):
+        """Test that rows with a source go straight to the upsert"""
+        EventFactory(project=project, event_source=event_source, timestamp=self.hour)
+
+        # Active projects, the grouped events query and the upsert
+        with django_assert_num_queries(3):
+            stats = aggregate_hourly_events_job(datetime_hour=self.hour)
+
+        assert stats["aggregations_written"] == 1
+
+    def test_rerun_replaces_daily_summary(self, project, event_source):
+        """Test that re-aggregating a day upserts its project summary"""
+        self.create_events(project, event_source, 2)
+
+        stats = aggregate_daily_events_job(date=self.hour.date())
+        assert stats["summaries_written"] == 1
+
+        self.create_events(project, event_source, 1)
+        EventFactory(project=project, user_id="", session_id="", timestamp=self.hour)
+        stats = aggregate_daily_events_job(date=self.hour.date())
+        assert stats["summaries_written"] == 1
+
+        summary = ProjectDailySummary.objects.get(project=project)
+        assert summary.total_events == 7
+        assert summary.source_breakdown[event_source.name] == 3
+        distinct_users = (
+            Event.objects.filter(project=project)
+            .exclude(user_id="")
+            .values("user_id")
+            .distinct()
+            .count()
+        )
+        assert summary.unique_users == distinct_users
+
+
+@pytest.mark.django_db
+class TestEventCountsByName:
+    """Test cases for Event.get_event_counts_by_name over rolled-up days"""
+
+    day = datetime(2026, 1, 1, tzinfo=UTC)
+
+    def test_combines_rollups_and_raw_events(self, project, event_source):
+        """Test that rolled-up days and raw events add up to the same counts"""
+        for offset in (timedelta(hours=10), timedelta(days=1, hours=10)):
+            for event_name in ("page_view", "page_view", "signup"):
+                EventFactory(
+                    project=project,
+                    event_source=event_source,
+                    event_name=event_name,
+                    timestamp=self.day + offset,
+                )
+
+        expected = [
+            {"event_name": "page_view", "count": 4},
+            {"event_name": "signup", "count": 2},
+        ]
+        assert Event.get_event_counts_by_name(project) == expected
+
+        # Roll up the first day; its events are now read from the aggregation
+        aggregate_daily_events_job(date=self.day.date())
+        Event.objects.filter(timestamp__lt=self.day + timedelta(days=1)).delete()
+
+        assert Event.get_event_counts_by_name(project) == expected
+        assert Event.get_event_counts_by_name(
+            project, start_date=self.day + timedelta(hours=12)
+        ) == [
+            {"event_name": "page_view", "count": 2},
+            {"event_name": "signup", "count": 1},
+        ]
+
+    def test_rollup_of_today_is_not_used(self, project, event_source):
+        """Test that events stored after a rollup of today are still counted"""
+        EventFactory(project=project, event_source=event_source, event_name="signup")
+        aggregate_daily_events_job(date=timezone.localdate())
+        EventFactory(project=project, event_source=event_source, event_name="signup")
+
+        assert Event.get_event_counts_by_name(project) == [
+            {"event_name": "signup", "count": 2}
+        ]
+
+
+@pytest.mark.django_db
+class TestTopEventNames:
+    """Test cases for Event.get_top_event_names over rolled-up hours"""
+
+    def test_combines_hourly_rollups_and_raw_events(self, project, event_source):
+        """Test that rolled-up hours and raw events add up to the same ranking"""
+        now = timezone.now()
+        start = now - timedelta(hours=6)
+        rolled_hour = (now - timedelta(hours=3)).replace(
+            minute=0, second=0, microsecond=0
+        )
+
+        for timestamp in (rolled_hour + timedelta(minutes=10), now):
+            for event_name in ("page_view", "page_view", "signup"):
+                EventFactory(
+                    project=project,
+                    event_source=event_source,
+                    event_name=event_name,
+                    timestamp=timestamp,
+                )
+
+        expected = [("page_view", 4), ("signup", 2)]
+        assert Event.get_top_event_names(project, start) == expected
+
+        # Roll up the earlier hour; its events are now read from the aggregation
+        aggregate_hourly_events_job(datetime_hour=rolled_hour)
+        Event.objects.filter(timestamp__lt=rolled_hour + timedelta(hours=1)).delete()
+
+        assert Event.get_top_event_names(project, start) == expected
+        assert Event.get_top_event_names(project, start, limit=1) == [("page_view", 4)]